@@ -1,8 +1,22 @@
-import requests
 import traceback
-from PIL import Image, ImageDraw, ImageFont, ImageEnhance
+from PIL import Image, ImageDraw, ImageEnhance
 from io import BytesIO
-from inky.auto import auto
+from presenter import Presenter
+from screen import Screen, register
+from fonts import get_font
+from fit import cached_fit
+from fetch_cache import cached_fetch, daily, max_age
+
+FONT_PATH = "./resources/fonts/Roboto-Regular.ttf"
+
+# How the picture is fitted to the panel, one of fit.FIT_MODES. Letterboxing
+# on black keeps the whole picture, which suits astronomy photos
+FIT_MODE = "letterbox"
+
+# NASA publishes the next picture at midnight US Eastern, about 05:00 UTC. Until
+# the new one has downloaded the previous day's is shown for up to six hours
+APOD_EXPIRY = daily(hour=5)
+APOD_STALE = 6 * 3600
 
 
 def load_api_key():
@@ -19,6 +33,13 @@ def load_api_key():
 
 
 def fetch_apod():
+    import requests  # Deferred so startup doesn't pay for it
+
+    def download(url):
+        response = requests.get(url, timeout=10)
+        response.raise_for_status()
+        return response
+
     # Grab API Key
     api_key = load_api_key()
     if api_key is None:
@@ -29,9 +50,7 @@ def fetch_apod():
     url = f"https://api.nasa.gov/planetary/apod?api_key={api_key}"
 
     try:
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        data = response.json()
+        data = cached_fetch("apod", lambda: download(url).json(), APOD_EXPIRY, stale_for=APOD_STALE)
 
         # Check if the APOD has an image
         if data["media_type"] != "image":
@@ -41,11 +60,13 @@ def fetch_apod():
         # Fetch the image
         image_url = data["url"]
         image_title = data["title"]
-        image_response = requests.get(image_url, timeout=10)
-        image_response.raise_for_status()
+        # A picture's URL never changes what it points at, so only the cache's size bound removes it
+        content = cached_fetch(
+            f"apod:{image_url}", lambda: download(image_url).content, max_age(30 * 24 * 3600)
+        )
 
         # load() forces full decode into memory; copy() detaches from the buffer
-        with Image.open(BytesIO(image_response.content)) as image:
+        with Image.open(BytesIO(content)) as image:
             image.load()
             return image.copy(), image_title
 
@@ -54,38 +75,40 @@ def fetch_apod():
         return None
 
 
-def display_apod():
+@register
+class ApodScreen(Screen):
+    """NASA's Astronomy Picture of the Day with its title."""
 
-    # Fetch and display the APOD image on the Inky display.
-
-    inky_display = auto()
-    inky_display.set_border(inky_display.BLACK)
-
-    try:
+    name = "apod"
+    border = "BLACK"
+    ttl = 6 * 3600  # One picture a day
+    fonts = [(FONT_PATH, 25)]
 
+    def fetch(self):
         result = fetch_apod()
 
         # Handle None or malformed return
         if not result or not isinstance(result, tuple) or len(result) != 2:
             print("APOD fetch failed or returned unexpected result.")
-            return False
-        apod_image, apod_title = result
+            return None
 
-        if apod_image is None:
+        if result[0] is None:
             print("No APOD image returned, skipping display.")
-            return False
+            return None
+        return result
 
-        print(f"NASA Image of the day displaying now!")
-        # Resize image to fit the Inky display
-        apod_image = apod_image.resize(inky_display.resolution)
+    def render(self, result, resolution):
+        apod_image, apod_title = result
+
+        # Fit the image to the Inky display, reusing the result if done before today
+        apod_image = cached_fit(f"apod:{apod_title}", apod_image, resolution, FIT_MODE, "black")
         # Get the resolution of the Inky display dynamically
         display_width, display_height = (
             apod_image.size
         )  # Assuming image is already resized to fit display
         draw = ImageDraw.Draw(apod_image)
-        # Font settings (update path to your font file)
-        font_path = "./resources/fonts/Roboto-Regular.ttf"
-        title_font = ImageFont.truetype(font_path, 25)
+        # Font settings (update FONT_PATH to change the font file)
+        title_font = get_font(FONT_PATH, 25)
         # Get text size to calculate bottom-right position
         bbox = draw.textbbox((0, 0), apod_title, font=title_font)
         text_width = bbox[2] - bbox[0]
@@ -102,9 +125,19 @@ def display_apod():
         )
         # Brighten the image slightly
         enhancer = ImageEnhance.Brightness(apod_image)
-        apod_image = enhancer.enhance(1.5)
-        inky_display.set_image(apod_image)
-        inky_display.show()
+        return enhancer.enhance(1.5)
+
+
+def display_apod():
+
+    # Fetch and display the APOD image on the Inky display.
+
+    try:
+
+        if not Presenter().present(ApodScreen()):
+            return False
+
+        print(f"NASA Image of the day displaying now!")
         return True
 
     except Exception as e:
@@ -114,4 +147,7 @@ def display_apod():
 
 
 if __name__ == "__main__":
+    import headless
+
+    headless.main("apod")  # With --headless this saves a PNG and exits
     display_apod()
@@ -0,0 +1,28 @@
+import os
+import threading
+
+from PIL import Image
+
+# (path, resolution) -> (mtime when loaded, decoded and scaled image)
+_backgrounds = {}
+_lock = threading.Lock()
+
+
+def get_background(path, resolution):
+    """
+    Return a copy of the background image at path scaled to resolution, ready
+    to draw on. Each file is decoded and resized once, then reloaded only if
+    it changes on disk.
+    """
+    key = (path, tuple(resolution))
+    mtime = os.path.getmtime(path)
+    with _lock:
+        cached = _backgrounds.get(key)
+    if cached is None or cached[0] != mtime:
+        with Image.open(path) as img:
+            img.load()
+            image = img.resize(key[1]) if img.size != key[1] else img.copy()
+        cached = (mtime, image)
+        with _lock:
+            _backgrounds[key] = cached
+    return cached[1].copy()
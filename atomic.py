@@ -0,0 +1,10 @@
+import json
+import os
+
+
+def write_json_atomic(path, data):
+    """Write JSON to a temp file then rename it over path, so a crash never leaves half a file."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
@@ -0,0 +1,168 @@
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import resource
+import statistics
+import subprocess
+import sys
+import time
+
+from display_manager import use_display
+from fixtures import DEFAULT_SPECS, offline_screen
+from presenter import Presenter
+from virtual_display import PALETTES, VirtualInky, parse_resolution
+
+
+def _run(func, args, results):
+    try:
+        results.put((func(*args), None))
+    except Exception as e:
+        results.put((None, e))
+
+
+def run_in_child(func, *args):
+    """
+    Call func(*args) in a forked child so its imports and allocations start
+    from the same baseline every time. Returns what func returned and
+    re-raises anything it raised.
+    """
+    context = multiprocessing.get_context("fork")
+    results = context.Queue()
+    child = context.Process(target=_run, args=(func, args, results))
+    child.start()
+    result, error = results.get()
+    child.join()
+    if error is not None:
+        raise error
+    return result
+
+
+def peak_rss_kb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _measure(func, *args):
+    before = peak_rss_kb()
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start, peak_rss_kb() - before
+
+
+def measure_in_child(func, *args):
+    """run_in_child() returning (seconds, peak RSS growth in KB) of func(*args)."""
+    return run_in_child(_measure, func, *args)
+
+
+def import_times(code):
+    """
+    Run code in a fresh interpreter under -X importtime. Returns
+    (total seconds, [(module, self seconds, cumulative seconds, depth)]) in
+    the order the imports finished; depth 0 is a direct import.
+    """
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True, text=True, check=True,
+    )
+    total = time.perf_counter() - start
+
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        modules.append((name.strip(), int(self_us) / 1e6, int(cumulative_us) / 1e6, depth))
+    return total, modules
+
+
+# ----------------- Screen benchmarks -----------------
+REGRESSION = 0.2  # Flag screens this much slower or bigger than the baseline
+MIN_PEAK_KB = 2048  # Ignore memory changes smaller than this, they are noise
+
+
+def render_offline(screen, inky):
+    """Draw a screen and show it on inky; seconds per stage and peak RSS growth in KB."""
+    before = peak_rss_kb()
+    presenter = Presenter(inky)
+    with contextlib.redirect_stdout(io.StringIO()):  # Keep the screens' progress messages out of the table
+        start = time.perf_counter()
+        frame = screen.draw(inky.resolution)
+        render = time.perf_counter() - start
+        if frame is None:
+            raise ValueError(f"{screen.name} drew nothing from its fixture")
+        presenter.show(frame, screen.saturation, screen.border)
+    timings = {"render": render, **presenter.timings}
+    timings["total"] = sum(timings.values())
+    timings["peak_kb"] = peak_rss_kb() - before
+    return timings
+
+
+def benchmark_screens(specs, inky, repeat=5):
+    """
+    Render each screen from its fixture repeat times, each in a fresh child,
+    after one warm-up render here so fonts, backgrounds and lazy imports are
+    loaded as they would be on a running display. Returns {spec: medians of
+    each stage in seconds, plus the largest peak RSS growth in KB}.
+    """
+    use_display(inky)
+    results = {}
+    for spec in specs:
+        try:
+            screen = offline_screen(spec)
+            render_offline(screen, inky)
+        except ImportError as e:
+            print(f"{spec:<24} skipped: {e}")
+            continue
+        runs = [run_in_child(render_offline, screen, inky) for _ in range(repeat)]
+        result = {stage: statistics.median(run[stage] for run in runs) for stage in runs[0] if stage != "peak_kb"}
+        result["peak_kb"] = max(run["peak_kb"] for run in runs)
+        results[spec] = result
+        print(
+            f"{spec[:24]:<24} {result['render'] * 1000:8.1f} ms {result['quantise'] * 1000:8.1f} ms"
+            f" {result['total'] * 1000:8.1f} ms {result['peak_kb'] / 1024:7.1f} MB"
+        )
+    return results
+
+
+def regressions(results, baseline):
+    """Descriptions of every screen that got slower or bigger than in baseline."""
+    found = []
+    for spec, result in results.items():
+        before = baseline.get(spec)
+        if not before:
+            continue
+        if result["total"] > before["total"] * (1 + REGRESSION):
+            change = result["total"] / before["total"] - 1
+            found.append(f"{spec}: {before['total'] * 1000:.1f} -> {result['total'] * 1000:.1f} ms (+{change:.0%})")
+        grew = result["peak_kb"] - before["peak_kb"]
+        if grew > MIN_PEAK_KB and result["peak_kb"] > before["peak_kb"] * (1 + REGRESSION):
+            found.append(f"{spec}: peak RSS {before['peak_kb'] / 1024:.1f} -> {result['peak_kb'] / 1024:.1f} MB")
+    return found
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Render time and memory of every screen from fixture data, with no panel or network."
+    )
+    parser.add_argument("specs", nargs="*", default=DEFAULT_SPECS, help="rotation entries to benchmark")
+    parser.add_argument("--repeat", type=int, default=5, help="renders per screen")
+    parser.add_argument("--resolution", type=parse_resolution, default=(640, 400), help="WIDTHxHEIGHT")
+    parser.add_argument("--palette", choices=sorted(PALETTES), default="impression")
+    parser.add_argument("--json", help="save the results to this file")
+    parser.add_argument("--compare", help="results saved with --json to check for regressions against")
+    args = parser.parse_args()
+
+    print(f"{'screen':<24} {'render':>11} {'quantise':>11} {'total':>11} {'peak RSS':>10}")
+    results = benchmark_screens(args.specs, VirtualInky(args.resolution, args.palette), args.repeat)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"resolution": args.resolution, "palette": args.palette, "screens": results}, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            found = regressions(results, json.load(f)["screens"])
+        for line in found:
+            print(f"Regression in {line}")
+        sys.exit(1 if found else 0)
@@ -4,8 +4,13 @@
 import json
 import sys
 from datetime import datetime
-from PIL import Image, ImageDraw, ImageFont
-from inky.auto import auto
+from PIL import ImageDraw
+from presenter import Presenter
+from screen import Screen, register
+from fonts import get_font
+from assets import get_background
+
+FONT_PATH = "./resources/fonts/Roboto-Medium.ttf"
 
 
 def read_birthdays(file_path):
@@ -21,58 +26,77 @@ def read_birthdays(file_path):
         return {}
 
 
-def check_birthdays():
+@register
+class BirthdayScreen(Screen):
+    """Names of anyone in birthdays.json whose birthday is today."""
 
-    # Check if today is anyone's birthday
-    today = datetime.today()
-    today_day_month = today.strftime(
-        "%d-%m"
-    )  # Get current day and month in 'DD-MM' format
-    birthdays = read_birthdays("./birthdays.json")
+    name = "birthdays"
+    ttl = 3600  # Only changes at midnight
+    fonts = [(FONT_PATH, 50)]
 
-    # Collect all matches for today's date
-    birthday_matches = [
-        name
-        for name, birthdate in birthdays.items()
-        if birthdate.startswith(today_day_month)
-    ]
+    def fetch(self):
 
-    if birthday_matches:
+        # Check if today is anyone's birthday
+        today = datetime.today()
+        today_day_month = today.strftime(
+            "%d-%m"
+        )  # Get current day and month in 'DD-MM' format
+        birthdays = read_birthdays("./birthdays.json")
+
+        # Collect all matches for today's date
+        birthday_matches = [
+            name
+            for name, birthdate in birthdays.items()
+            if birthdate.startswith(today_day_month)
+        ]
+
+        if not birthday_matches:
+            print("No birthdays today.")
+            return None
         print("There are birthdays today!")
-        inky = auto()
-        with Image.open("./resources/imgs/birthday-bg1-01.png") as img:
-            draw = ImageDraw.Draw(img)
-
-            # Font settings (update path to your font file)
-            font_path = "./resources/fonts/Roboto-Medium.ttf"
-            font = ImageFont.truetype(font_path, 50)
-
-            # Birthday message for the inky
-            names = "\n".join(birthday_matches)
-            message = f"Birthdays Today!\n{names}"
-
-            # Measure text size
-            text_bbox = draw.multiline_textbbox((0, 0), message, font=font)
-            text_width = text_bbox[2] - text_bbox[0]
-            text_height = text_bbox[3] - text_bbox[1]
-
-            # Calculate position to center the text
-            image_width, image_height = img.size
-            x_position = (image_width - text_width) // 2
-            y_position = (image_height - text_height) // 2
-
-            # Draw the text on the image
-            draw.multiline_text(
-                (x_position, y_position), message, font=font, align="center", fill=0
-            )  # Black text
-            # Show on the Inky
-            inky.set_image(img)
-            inky.show()
-            return birthday_matches  # Return the list of names for further use if needed
-    else:
-        print("No birthdays today.")
-        return None
+        return birthday_matches
+
+    def render(self, birthday_matches, resolution):
+        img = get_background("./resources/imgs/birthday-bg1-01.png", resolution)
+        draw = ImageDraw.Draw(img)
+
+        # Font settings (update FONT_PATH to change the font file)
+        font = get_font(FONT_PATH, 50)
+
+        # Birthday message for the inky
+        names = "\n".join(birthday_matches)
+        message = f"Birthdays Today!\n{names}"
+
+        # Measure text size
+        text_bbox = draw.multiline_textbbox((0, 0), message, font=font)
+        text_width = text_bbox[2] - text_bbox[0]
+        text_height = text_bbox[3] - text_bbox[1]
+
+        # Calculate position to center the text
+        image_width, image_height = img.size
+        x_position = (image_width - text_width) // 2
+        y_position = (image_height - text_height) // 2
+
+        # Draw the text on the image
+        draw.multiline_text(
+            (x_position, y_position), message, font=font, align="center", fill=0
+        )  # Black text
+        return img
+
+
+def check_birthdays():
+    screen = BirthdayScreen()
+    birthday_matches = screen.fetch()
+
+    if birthday_matches:
+        # Show on the Inky
+        presenter = Presenter()
+        presenter.show(screen.render(birthday_matches, presenter.resolution))
+    return birthday_matches  # Return the list of names for further use if needed
 
 
 if __name__ == "__main__":
+    import headless
+
+    headless.main("birthdays")  # With --headless this saves a PNG and exits
     check_birthdays()
@@ -0,0 +1,58 @@
+import asyncio
+
+from gpiozero import Button
+
+# GPIO pins of the four buttons on the Inky Impression
+BUTTON_PINS = {"a": 5, "b": 6, "c": 16, "d": 24}
+
+
+class ButtonDispatcher:
+    """
+    Queues gpiozero when_pressed callbacks onto the asyncio loop so the
+    scheduler can wait for a press or a timeout instead of polling the pins.
+    Each button is bound to an action name; presses on unbound buttons are ignored.
+    """
+
+    def __init__(self, loop, actions=None, pins=BUTTON_PINS):
+        self.loop = loop
+        self.actions = dict(actions or {})
+        self.events = asyncio.Queue()
+        self.buttons = {}
+        for name, pin in pins.items():
+            button = Button(pin)
+            button.when_pressed = self._on_press(name)
+            self.buttons[name] = button
+
+    def _on_press(self, name):
+        # Runs on gpiozero's callback thread, so hand the press over to the loop
+        def pressed():
+            self.loop.call_soon_threadsafe(self.events.put_nowait, name)
+
+        return pressed
+
+    def bind(self, name, action):
+        """Bind a button to an action name, or unbind it with None."""
+        self.actions[name] = action
+
+    async def wait(self, timeout):
+        """
+        Wait until a bound button is pressed or timeout seconds pass.
+        Returns the bound action name, or None on timeout.
+        """
+        deadline = self.loop.time() + timeout
+        while True:
+            remaining = deadline - self.loop.time()
+            if remaining <= 0:
+                return None
+            try:
+                name = await asyncio.wait_for(self.events.get(), remaining)
+            except asyncio.TimeoutError:
+                return None
+            action = self.actions.get(name)
+            if action:
+                print(f"Button {name.upper()} pressed: {action}")
+                return action
+
+    def close(self):
+        for button in self.buttons.values():
+            button.close()
@@ -0,0 +1,235 @@
+import argparse
+import math
+import time
+from datetime import datetime, timedelta
+
+from PIL import Image, ImageDraw
+
+from fonts import get_font
+
+FONT_PATH = "./resources/fonts/Roboto-Medium.ttf"
+
+# Pure colours that land on an Inky Impression palette entry instead of dithering
+BLACK = (0, 0, 0)
+WHITE = (255, 255, 255)
+BLUE = (0, 0, 255)
+RED = (255, 0, 0)
+GREEN = (0, 255, 0)
+ORANGE = (255, 140, 0)
+
+
+def nice_ticks(low, high, count=5):
+    """Round tick values covering low..high, about count of them."""
+    if high <= low:
+        high = low + 1
+    raw_step = (high - low) / max(1, count - 1)
+    magnitude = 10 ** math.floor(math.log10(raw_step))
+    step = next(m * magnitude for m in (1, 2, 2.5, 5, 10) if m * magnitude >= raw_step)
+    first = math.floor(low / step) * step
+    ticks = []
+    value = first
+    while value <= high + step * 0.001:
+        ticks.append(round(value, 10))
+        value += step
+    if ticks[-1] < high:
+        ticks.append(round(value, 10))
+    return ticks
+
+
+def format_tick(value):
+    if abs(value) >= 1000:
+        return f"{value:,.0f}"
+    return f"{value:g}"
+
+
+def dotted_line(draw, start, end, fill=BLACK, gap=4):
+    """A dotted line, which reads as a light gridline without any greys to dither."""
+    (x1, y1), (x2, y2) = start, end
+    length = max(abs(x2 - x1), abs(y2 - y1))
+    for i in range(0, length + 1, gap):
+        t = i / length if length else 0
+        draw.point((round(x1 + (x2 - x1) * t), round(y1 + (y2 - y1) * t)), fill=fill)
+
+
+def draw_line_chart(
+    draw,
+    box,
+    series,
+    x_format=format_tick,
+    y_label=None,
+    legend=True,
+    markers=False,
+    font_size=16,
+    x_ticks=5,
+    y_ticks=5,
+):
+    """
+    Draw a line chart straight onto a PIL image inside box (left, top, right, bottom).
+
+    series is a list of (label, [(x, y), ...], colour). x values are numbers,
+    e.g. timestamps, and x_format turns one into its axis label.
+    """
+    font = get_font(FONT_PATH, font_size)
+    left, top, right, bottom = box
+
+    xs = [x for _, points, _ in series for x, _ in points]
+    ys = [y for _, points, _ in series for _, y in points]
+    if not xs:
+        return
+    x_min, x_max = min(xs), max(xs)
+    if x_max == x_min:
+        x_max = x_min + 1
+    y_values = nice_ticks(min(ys), max(ys), y_ticks)
+    y_min, y_max = y_values[0], y_values[-1]
+
+    # Leave room for the axis labels around the plot area
+    def text_size(text):
+        b = draw.textbbox((0, 0), text, font=font)
+        return b[2] - b[0], b[3] - b[1]
+
+    y_texts = [format_tick(v) for v in y_values]
+    label_w = max(text_size(t)[0] for t in y_texts)
+    _, label_h = text_size("0")
+    line_h = sum(font.getmetrics())
+    plot_left = left + label_w + 8
+    if y_label:
+        plot_left += label_h + 6
+    plot_right = right - 6
+    plot_top = top + label_h // 2 + 2
+    plot_bottom = bottom - label_h - 10
+
+    def to_px(x, y):
+        px = plot_left + (x - x_min) / (x_max - x_min) * (plot_right - plot_left)
+        py = plot_bottom - (y - y_min) / (y_max - y_min) * (plot_bottom - plot_top)
+        return round(px), round(py)
+
+    # Y axis: gridlines and labels
+    for value, text in zip(y_values, y_texts):
+        _, py = to_px(x_min, value)
+        dotted_line(draw, (plot_left, py), (plot_right, py))
+        tw, th = text_size(text)
+        draw.text((plot_left - tw - 6, py - th // 2 - 2), text, font=font, fill=BLACK)
+    if y_label:
+        tw, th = text_size(y_label)
+        # Drawn as a mask and rotated, then stamped in black with bitmap()
+        label = Image.new("L", (tw + 2, th + 6), 0)
+        ImageDraw.Draw(label).text((0, 0), y_label, font=font, fill=255)
+        label = label.rotate(90, expand=True)
+        y = (plot_top + plot_bottom - label.height) // 2
+        draw.bitmap((left, y), label, fill=BLACK)
+
+    # X axis: evenly spaced labels
+    for i in range(x_ticks):
+        value = x_min + (x_max - x_min) * i / max(1, x_ticks - 1)
+        px, _ = to_px(value, y_min)
+        dotted_line(draw, (px, plot_top), (px, plot_bottom))
+        text = x_format(value)
+        tw, _ = text_size(text)
+        tx = min(max(px - tw // 2, left), right - tw - 2)
+        draw.text((tx, plot_bottom + 6), text, font=font, fill=BLACK)
+
+    draw.rectangle([plot_left, plot_top, plot_right, plot_bottom], outline=BLACK, width=1)
+
+    # The lines themselves
+    for _, points, colour in series:
+        pixels = [to_px(x, y) for x, y in points]
+        if len(pixels) > 1:
+            draw.line(pixels, fill=colour, width=2, joint="curve")
+        if markers:
+            for px, py in pixels:
+                draw.ellipse([px - 3, py - 3, px + 3, py + 3], fill=colour)
+
+    if legend:
+        lx, ly = plot_left + 8, plot_top + 6
+        legend_w = max(text_size(label)[0] for label, _, _ in series) + 30
+        legend_h = len(series) * (line_h + 6)
+        draw.rectangle([lx - 4, ly - 4, lx + legend_w, ly + legend_h], fill=WHITE, outline=BLACK)
+        for label, _, colour in series:
+            draw.line([(lx, ly + line_h // 2), (lx + 18, ly + line_h // 2)], fill=colour, width=3)
+            draw.text((lx + 24, ly), label, font=font, fill=BLACK, anchor="la")
+            ly += line_h + 6
+
+
+def draw_sparkline(draw, box, values, colour=BLACK, width=2):
+    """A bare line of values scaled to fill box (left, top, right, bottom), with a dot on the last one."""
+    left, top, right, bottom = box
+    if len(values) < 2:
+        return
+    low, high = min(values), max(values)
+    span = (high - low) or 1
+    step = (right - left) / (len(values) - 1)
+    pixels = [
+        (round(left + i * step), round(bottom - (value - low) / span * (bottom - top)))
+        for i, value in enumerate(values)
+    ]
+    draw.line(pixels, fill=colour, width=width, joint="curve")
+    x, y = pixels[-1]
+    draw.ellipse([x - 3, y - 3, x + 3, y + 3], fill=colour)
+
+
+# ----------------- Benchmark -----------------
+def sample_series(days=180):
+    start = datetime(2025, 1, 1)
+    return [
+        (start + timedelta(days=i), 100 + 10 * math.sin(i / 9) + i / 6)
+        for i in range(days)
+    ]
+
+
+def pillow_chart(resolution):
+    points = [(d.timestamp(), v) for d, v in sample_series()]
+    image = Image.new("RGB", resolution, WHITE)
+    draw_line_chart(
+        ImageDraw.Draw(image), (0, 0, resolution[0], resolution[1]),
+        [("Closing Price", points, BLUE)],
+        x_format=lambda ts: datetime.fromtimestamp(ts).strftime("%d-%b"),
+        y_label="Price",
+    )
+    return image
+
+
+def matplotlib_chart(resolution):
+    """The previous path: figure, PNG encode, PNG decode and resize."""
+    import io
+    import matplotlib.pyplot as plt
+    import matplotlib.dates as mdates
+
+    series = sample_series()
+    plt.figure(figsize=(4, 3))
+    plt.plot([d for d, _ in series], [v for _, v in series], label="Closing Price", color="blue")
+    plt.gca().xaxis.set_major_formatter(mdates.DateFormatter("%d-%b"))
+    plt.xticks(rotation=45)
+    plt.ylabel("Price")
+    plt.grid(True)
+    plt.legend()
+    buf = io.BytesIO()
+    plt.savefig(buf, format="png", bbox_inches="tight")
+    plt.close()
+    buf.seek(0)
+    with Image.open(buf) as img:
+        return img.resize(resolution)
+
+
+def benchmark(resolution=(640, 400)):
+    """Print time and peak RSS growth, imports included, for each chart path."""
+    from bench import measure_in_child  # Only needed here, so screens drawing charts don't load it
+    for label, func in (("matplotlib", matplotlib_chart), ("pillow", pillow_chart)):
+        try:
+            elapsed, peak_kb = measure_in_child(func, resolution)
+        except ImportError as e:
+            print(f"{label:<12} skipped: {e}")
+            continue
+        print(f"{label:<12} {elapsed * 1000:8.1f} ms  {peak_kb / 1024:7.1f} MB peak RSS")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--benchmark", action="store_true", help="compare against matplotlib")
+    parser.add_argument("--out", help="save a sample chart to this file")
+    args = parser.parse_args()
+    if args.benchmark:
+        benchmark()
+    if args.out:
+        start = time.perf_counter()
+        pillow_chart((640, 400)).save(args.out)
+        print(f"Saved {args.out} in {(time.perf_counter() - start) * 1000:.1f} ms")
@@ -5,24 +5,36 @@ import argparse
 import time
 
 from PIL import Image
-from inky.auto import auto
+from display_manager import get_display, get_palette, use_display
 
 
-def run_clear(cycles=3):
-    inky_display = auto()
-    colours = (inky_display.RED, inky_display.BLACK, inky_display.WHITE)
-    colour_names = (inky_display.colour, "black", "white")
+def clean_sequence(palette):
+    """Every colour the panel has, finishing on white."""
+    names = [name for name in palette if name != "white"]
+    if "white" in palette:
+        names.append("white")
+    return names
 
-    img = Image.new("P", (inky_display.WIDTH, inky_display.HEIGHT))
+
+def run_clear(cycles=3, inky_display=None, colours=None):
+    if inky_display is not None:
+        use_display(inky_display)  # The palette comes from the shared display, so it must be this one
+    inky_display = get_display()
+    palette = get_palette()
+    colour_names = colours or clean_sequence(palette)
+    unknown = [name for name in colour_names if name not in palette]
+    if unknown:
+        raise ValueError(f"Colours not supported by this display: {', '.join(unknown)}")
+
+    # One solid frame per colour, built once and reused for every cycle
+    size = (inky_display.WIDTH, inky_display.HEIGHT)
+    frames = [(name, palette[name], Image.new("P", size, palette[name])) for name in colour_names]
 
     for i in range(cycles):
         print("Cleaning cycle %i\n" % (i + 1))
-        for j, c in enumerate(colours):
-            print("- updating with %s" % colour_names[j])
+        for name, c, img in frames:
+            print("- updating with %s" % name)
             inky_display.set_border(c)
-            for x in range(inky_display.WIDTH):
-                for y in range(inky_display.HEIGHT):
-                    img.putpixel((x, y), c)
             inky_display.set_image(img)
             inky_display.show()
             time.sleep(1)
@@ -33,14 +45,19 @@ def run_clear(cycles=3):
 
 if __name__ == "__main__":
     print(
-        """Inky pHAT: Clean
+        """Inky: Clean
 
-Displays solid blocks of red, black, and white to clean the Inky pHAT
-display of any ghosting.
+Displays solid blocks of every colour the panel supports to clean the
+Inky display of any ghosting.
 
 """
     )
     parser = argparse.ArgumentParser()
     parser.add_argument("--number", "-n", type=int, required=False, help="number of cycles")
+    parser.add_argument(
+        "--colours", "-c", required=False,
+        help="comma separated colours to cycle, e.g. red,black,white (default: all)",
+    )
     args, _ = parser.parse_known_args()
-    run_clear(cycles=args.number if args.number else 3)
+    colours = args.colours.lower().split(",") if args.colours else None
+    run_clear(cycles=args.number if args.number else 3, colours=colours)
@@ -1,29 +1,41 @@
-from PIL import Image, ImageDraw, ImageFont
+from PIL import ImageDraw
 import datetime
-from inky.auto import auto
+from presenter import Presenter
+from screen import Screen, register
+from fonts import get_font
+from assets import get_background
 
+FONT_PATH = "./resources/fonts/Roboto-Medium.ttf"
 
-def get_date():
 
-    # Prepare the display
-    inky = auto()
-    with Image.open("./resources/imgs/Date-bg1-01.png") as img:
-        img = img.resize(inky.resolution)
+@register
+class DateScreen(Screen):
+    """Today's day, date and month."""
+
+    name = "date"
+    ttl = 600  # Catch the day rolling over
+    fonts = [(FONT_PATH, size) for size in (90, 50)]
+
+    def fetch(self):
+        return datetime.date.today()
+
+    def render(self, todays_date, resolution):
+
+        # Prepare the background
+        img = get_background("./resources/imgs/Date-bg1-01.png", resolution)
         draw = ImageDraw.Draw(img)
         display_width, display_height = (
             img.size
         )  # Assuming image is already resized to fit display
 
         # Pull the date elements into seperate variables
-        todays_date = datetime.datetime.now()
         date_num = todays_date.strftime("%d")
         date_day = todays_date.strftime("%A")
         date_month = todays_date.strftime("%B")
 
-        # Font settings (update path to your font file)
-        font_path = "./resources/fonts/Roboto-Medium.ttf"
-        num_font = ImageFont.truetype(font_path, 90)
-        text_font = ImageFont.truetype(font_path, 50)
+        # Font settings (update FONT_PATH to change the font file)
+        num_font = get_font(FONT_PATH, 90)
+        text_font = get_font(FONT_PATH, 50)
 
         # Define Displayed Lines
         line1 = f"{date_day}"
@@ -51,9 +63,15 @@ def get_date():
         y_position += (b2[3] - b2[1]) + text_spacing
         draw.text((x_position, y_position), line3, font=text_font, fill="black")
 
-        inky.set_image(img)
-        inky.show()
+        return img
+
+
+def get_date():
+    Presenter().present(DateScreen())
 
 
 if __name__ == "__main__":
+    import headless
+
+    headless.main("date")  # With --headless this saves a PNG and exits
     get_date()
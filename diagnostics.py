@@ -0,0 +1,90 @@
+import json
+from datetime import datetime
+
+from PIL import Image, ImageDraw
+
+from charts import BLACK, RED
+from fonts import get_font
+from presenter import Presenter
+from profiling import STAGES, STATS_FILE
+from screen import Screen, register
+
+FONT_PATH = "./resources/fonts/Roboto-Medium.ttf"
+SLOW_SECONDS = 10  # Stages other than the panel refresh whose p95 is slower than this are shown in red
+
+
+def fmt_timing(timing):
+    """p50/p95/max in one unit, milliseconds unless any of them is a second or more."""
+    values = [timing[key] for key in ("p50", "p95", "max")]
+    if max(values) < 1:
+        return "/".join(f"{v * 1000:.0f}" for v in values) + "ms"
+    return "/".join(f"{v:.1f}" for v in values) + "s"
+
+
+@register
+class DiagnosticsScreen(Screen):
+    """How long each screen's fetch, render, quantise and panel refresh take, from the scheduler's timings."""
+
+    name = "diagnostics"
+    ttl = 300
+    fonts = [(FONT_PATH, 28), (FONT_PATH, 16), (FONT_PATH, 14)]
+
+    def __init__(self, path=STATS_FILE):
+        self.path = path
+
+    def fetch(self):
+        try:
+            with open(self.path) as f:
+                stats = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"No timings to show yet: {e}")
+            return None
+        return stats if stats.get("screens") else None
+
+    def render(self, stats, resolution):
+        width, height = resolution
+        image = Image.new("RGB", resolution, "white")
+        draw = ImageDraw.Draw(image)
+        font_title = get_font(FONT_PATH, 28)
+        font = get_font(FONT_PATH, 16)
+        font_small = get_font(FONT_PATH, 14)
+
+        draw.text((12, 8), "Diagnostics", font=font_title, fill=BLACK)
+        updated = datetime.fromtimestamp(stats["updated"]).strftime("%d %b %H:%M")
+        note = f"p50 / p95 / max, updated {updated}"
+        b = draw.textbbox((0, 0), note, font=font_small)
+        draw.text((width - (b[2] - b[0]) - 12, 20), note, font=font_small, fill=BLACK)
+        draw.line([(12, 46), (width - 12, 46)], fill=BLACK, width=2)
+
+        # One row per screen, one column per stage
+        name_w = 140
+        col_w = (width - 12 - name_w) // len(STAGES)
+        row_h = 22
+        y = 52
+        for i, stage in enumerate(STAGES):
+            draw.text((name_w + i * col_w, y), stage.capitalize(), font=font, fill=BLACK)
+        y += row_h + 4
+
+        screens = sorted(stats["screens"].items())
+        rows = (height - y) // row_h
+        for name, stages in screens[:rows]:
+            draw.text((12, y), name[:18], font=font, fill=BLACK)
+            for i, stage in enumerate(STAGES):
+                timing = stages.get(stage)
+                if not timing:
+                    continue
+                slow = stage != "panel" and timing["p95"] > SLOW_SECONDS
+                draw.text((name_w + i * col_w, y + 2), fmt_timing(timing), font=font_small, fill=RED if slow else BLACK)
+            y += row_h
+        return image
+
+
+def display_diagnostics():
+    Presenter().present(DiagnosticsScreen())
+
+
+if __name__ == "__main__":
+    import headless
+
+    headless.main("diagnostics")  # With --headless this saves a PNG and exits
+    display_diagnostics()
@@ -0,0 +1,78 @@
+import threading
+from functools import lru_cache
+
+from PIL import Image
+
+# Colour constants an Inky driver may define, in the order they are cycled
+PALETTE_COLOURS = ("BLACK", "WHITE", "GREEN", "BLUE", "RED", "YELLOW", "ORANGE")
+
+_display = None
+_lock = threading.Lock()
+
+
+def get_display():
+    """
+    Return the shared Inky driver, detecting the panel on first use.
+    auto() reads the EEPROM and sets up GPIO/SPI, so it only runs once per process.
+    """
+    global _display
+    with _lock:
+        if _display is None:
+            from inky.auto import auto  # Deferred so use_display() works without the inky library
+
+            _display = auto()
+    return _display
+
+
+def use_display(inky):
+    """Use inky, e.g. a VirtualInky, as the panel instead of detecting one."""
+    global _display
+    with _lock:
+        _display = inky
+    get_palette.cache_clear()
+    get_palette_image.cache_clear()
+
+
+def get_resolution():
+    return get_display().resolution
+
+
+@lru_cache(maxsize=None)
+def get_palette():
+    """Return {colour name: palette index} for the colours the panel can show."""
+    inky = get_display()
+    names = PALETTE_COLOURS
+    # Red and yellow pHAT/wHAT boards share one index for their third colour
+    if getattr(inky, "colour", None) in ("red", "yellow"):
+        names = ("BLACK", "WHITE", inky.colour.upper())
+
+    palette = {}
+    for name in names:
+        index = getattr(inky, name, None)
+        if index is not None and index not in palette.values():
+            palette[name.lower()] = index
+    return palette
+
+
+@lru_cache(maxsize=None)
+def get_palette_image(saturation=0.5):
+    """
+    Return a "P" image holding the panel's RGB palette blended for saturation,
+    ready for Image.quantize(). This is the same palette the Impression drivers
+    build in set_image(); None for panels that take palette indexes directly.
+    """
+    palette_blend = getattr(get_display(), "_palette_blend", None)
+    if palette_blend is None:
+        return None
+    palette = palette_blend(saturation)
+    palette_image = Image.new("P", (1, 1))
+    palette_image.putpalette(palette + [0, 0, 0] * (256 - len(palette) // 3))
+    return palette_image
+
+
+def quantise(frame, saturation=0.5):
+    """Reduce a frame to the panel's palette with dithering, the way set_image() would."""
+    palette_image = get_palette_image(saturation) if saturation is not None else None
+    if palette_image is None:
+        return frame
+    return frame.convert("RGB").quantize(palette=palette_image, dither=Image.Dither.FLOYDSTEINBERG)
@@ -0,0 +1,157 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from atomic import write_json_atomic
+
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".pi-display", "fetch")
+MAX_BYTES = 64 * 1024 * 1024  # Oldest entries are removed past this
+
+_refreshing = set()  # Keys being revalidated in the background
+_lock = threading.Lock()
+
+
+# ----------------- Expiry Policies -----------------
+# A policy takes the time a value was fetched and returns when it expires
+
+
+def max_age(seconds):
+    """Expire a fixed number of seconds after fetching."""
+    return lambda fetched_at: fetched_at + seconds
+
+
+def daily(hour=0, tz=timezone.utc):
+    """Expire at the first hour:00 in tz after fetching, e.g. when a new picture is published."""
+
+    def expires_at(fetched_at):
+        fetched = datetime.fromtimestamp(fetched_at, tz)
+        boundary = fetched.replace(hour=hour, minute=0, second=0, microsecond=0)
+        if boundary <= fetched:
+            boundary += timedelta(days=1)
+        return boundary.timestamp()
+
+    return expires_at
+
+
+# Prices are settled by 09:00 UTC, so a new market day starts then wherever the Pi is
+market_day = daily(hour=9)
+
+
+# ----------------- Storage -----------------
+def _paths(key, cache_dir):
+    name = hashlib.sha1(key.encode()).hexdigest()[:16]
+    return os.path.join(cache_dir, f"{name}.json"), os.path.join(cache_dir, f"{name}.bin")
+
+
+def read(key, cache_dir=CACHE_DIR):
+    """Return (value, fetched_at) for key, or None if nothing is cached."""
+    meta_path, data_path = _paths(key, cache_dir)
+    try:
+        with open(meta_path) as f:
+            meta = json.load(f)
+        if meta.get("binary"):
+            with open(data_path, "rb") as f:
+                return f.read(), meta["fetched_at"]
+        return meta["value"], meta["fetched_at"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def write(key, value, fetched_at=None, cache_dir=CACHE_DIR):
+    """Store value for key. Values are anything JSON can hold, or bytes."""
+    os.makedirs(cache_dir, exist_ok=True)
+    meta_path, data_path = _paths(key, cache_dir)
+    meta = {"key": key, "fetched_at": fetched_at or time.time()}
+    if isinstance(value, bytes):
+        tmp_path = f"{data_path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(value)
+        os.replace(tmp_path, data_path)
+        meta["binary"] = True
+    else:
+        meta["value"] = value
+    # The metadata goes last, so it never points at data that isn't there yet
+    write_json_atomic(meta_path, meta)
+    prune(cache_dir)
+
+
+def prune(cache_dir=CACHE_DIR, max_bytes=MAX_BYTES):
+    """Delete the least recently written entries until the cache fits in max_bytes."""
+    entries = {}
+    for name in os.listdir(cache_dir):
+        stem, ext = os.path.splitext(name)
+        if ext not in (".json", ".bin"):
+            continue
+        stat = os.stat(os.path.join(cache_dir, name))
+        size, mtime = entries.get(stem, (0, 0))
+        entries[stem] = (size + stat.st_size, max(mtime, stat.st_mtime))
+
+    total = sum(size for size, _ in entries.values())
+    for stem, (size, _) in sorted(entries.items(), key=lambda e: e[1][1]):
+        if total <= max_bytes:
+            break
+        for ext in (".json", ".bin"):
+            try:
+                os.remove(os.path.join(cache_dir, stem + ext))
+            except FileNotFoundError:
+                pass
+        total -= size
+
+
+# ----------------- Fetching -----------------
+def _revalidate(key, fetch, cache_dir):
+    try:
+        value = fetch()
+        if value is not None:
+            write(key, value, cache_dir=cache_dir)
+    except Exception as e:
+        print(f"Background refresh of {key} failed: {e}")
+    finally:
+        with _lock:
+            _refreshing.discard(key)
+
+
+def cached_fetch(key, fetch, expires, stale_for=0, cache_dir=CACHE_DIR):
+    """
+    Return fetch()'s result for key, only calling it once the cached value
+    has expired according to the expires policy.
+
+    For stale_for seconds after expiry the old value is returned straight
+    away while a background thread fetches a new one. If fetch() raises or
+    returns None the last cached value is returned however old it is, and
+    None is never cached.
+    """
+    cached = read(key, cache_dir)
+    now = time.time()
+    if cached is not None:
+        value, fetched_at = cached
+        expires_at = expires(fetched_at)
+        if now < expires_at:
+            return value
+        if now < expires_at + stale_for:
+            with _lock:
+                start = key not in _refreshing
+                _refreshing.add(key)
+            if start:
+                threading.Thread(
+                    target=_revalidate, args=(key, fetch, cache_dir), daemon=True
+                ).start()
+            return value
+
+    try:
+        value = fetch()
+    except Exception as e:
+        if cached is None:
+            raise
+        print(f"Fetching {key} failed: {e}")
+        value = None
+    if value is None:
+        if cached is not None:
+            print(f"Using stale cached {key} from {time.ctime(cached[1])}")
+            return cached[0]
+        return None
+    write(key, value, cache_dir=cache_dir)
+    return value
@@ -0,0 +1,133 @@
+import hashlib
+import os
+
+from PIL import Image, ImageFilter, ImageOps, ImageStat
+
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".pi-display", "fit")
+MAX_CACHED = 200  # Oldest results are removed beyond this many files
+
+# stretch    resize to the panel, ignoring aspect ratio
+# letterbox  fit the whole image inside the panel, padding the edges
+# cover      fill the panel, cropping the overflow evenly from both sides
+# entropy    fill the panel, keeping the most detailed part of the image
+# saliency   fill the panel, keeping the part with the strongest edges
+FIT_MODES = ("stretch", "letterbox", "cover", "entropy", "saliency")
+
+SEARCH_SIZE = 128  # Longest side of the thumbnail smart crops are chosen on
+SEARCH_STEPS = 9  # Crop positions tried along the axis being cropped
+
+
+def scaled_size(size, resolution, mode):
+    """The smallest size an image of size needs to be decoded at for mode."""
+    width, height = size
+    if mode == "stretch":
+        return tuple(resolution)
+    if mode == "letterbox":
+        scale = min(resolution[0] / width, resolution[1] / height)
+    else:
+        scale = max(resolution[0] / width, resolution[1] / height)
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def reduce_to(image, size):
+    """
+    Shrink an image by the largest whole factor that keeps it at least size,
+    using reduce()'s cheap box filter ahead of the real resample.
+    """
+    factor = min(image.width // size[0], image.height // size[1])
+    if factor < 2:
+        return image
+    if image.mode not in ("RGB", "RGBA", "L", "LA"):
+        image = image.convert("RGB")  # reduce() doesn't handle palette images
+    return image.reduce(factor)
+
+
+def crop_centering(image, resolution, mode):
+    """
+    Pick where to crop for a smart mode, as the (x, y) centering ImageOps.fit()
+    takes. Every candidate window is scored on a small greyscale copy so this
+    stays cheap whatever the size of the source.
+    """
+    small = ImageOps.contain(image, (SEARCH_SIZE, SEARCH_SIZE), Image.Resampling.BOX).convert("L")
+    if mode == "saliency":
+        small = small.filter(ImageFilter.FIND_EDGES)
+
+    width, height = small.size
+    scale = max(resolution[0] / width, resolution[1] / height)
+    crop_w = min(width, round(resolution[0] / scale))
+    crop_h = min(height, round(resolution[1] / scale))
+    slack_x, slack_y = width - crop_w, height - crop_h
+    if slack_x <= 0 and slack_y <= 0:
+        return 0.5, 0.5
+
+    best, best_score = 0.5, None
+    for step in range(SEARCH_STEPS):
+        position = step / (SEARCH_STEPS - 1)
+        left, top = round(slack_x * position), round(slack_y * position)
+        window = small.crop((left, top, left + crop_w, top + crop_h))
+        if mode == "saliency":
+            score = ImageStat.Stat(window).mean[0]
+        else:
+            score = window.entropy()
+        if best_score is None or score > best_score:
+            best, best_score = position, score
+    return (best, 0.5) if slack_x > 0 else (0.5, best)
+
+
+def fit_image(image, resolution, mode="cover", background="white"):
+    """Scale an image to resolution using one of FIT_MODES."""
+    resolution = tuple(resolution)
+    if mode not in FIT_MODES:
+        raise ValueError(f"Unknown fit mode {mode!r}, expected one of {', '.join(FIT_MODES)}")
+
+    image = reduce_to(image, scaled_size(image.size, resolution, mode)).convert("RGB")
+
+    if mode == "stretch":
+        return image.resize(resolution)
+
+    if mode == "letterbox":
+        fitted = ImageOps.contain(image, resolution)
+        canvas = Image.new("RGB", resolution, background)
+        canvas.paste(fitted, ((resolution[0] - fitted.width) // 2, (resolution[1] - fitted.height) // 2))
+        return canvas
+
+    centering = (0.5, 0.5) if mode == "cover" else crop_centering(image, resolution, mode)
+    return ImageOps.fit(image, resolution, centering=centering)
+
+
+def cached_fit(key, image, resolution, mode="cover", background="white", cache_dir=CACHE_DIR):
+    """
+    fit_image() with the result kept on disk, so an image seen before under
+    the same key, resolution and mode is only ever fitted once. key should
+    change whenever the image does, e.g. a URL or path and mtime.
+    """
+    digest = hashlib.sha1(f"{key}|{tuple(resolution)}|{mode}|{background}".encode()).hexdigest()
+    path = os.path.join(cache_dir, f"{digest}.png")
+    try:
+        with Image.open(path) as cached:
+            fitted = cached.convert("RGB")
+        os.utime(path)  # Keep recently used results when pruning
+        return fitted
+    except OSError:
+        pass
+
+    fitted = fit_image(image, resolution, mode, background)
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    fitted.save(tmp_path, format="PNG")
+    os.replace(tmp_path, path)
+    prune(cache_dir)
+    return fitted
+
+
+def prune(cache_dir, keep=MAX_CACHED):
+    with os.scandir(cache_dir) as entries:
+        files = sorted(
+            (entry for entry in entries if entry.name.endswith(".png")),
+            key=lambda entry: entry.stat().st_mtime,
+        )
+    for entry in files[:-keep]:
+        try:
+            os.remove(entry.path)
+        except OSError:
+            pass
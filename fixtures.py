@@ -0,0 +1,228 @@
+import os
+import random
+import tempfile
+import zlib
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from PIL import Image, ImageOps
+
+from screen import screen_class
+
+# Every fixture is drawn from this moment and seed, so each run renders identical frames
+FIXTURE_TIME = datetime(2026, 3, 14, 12, 0)
+SEED = 20260314
+PHOTO_PATH = os.path.join(tempfile.gettempdir(), "pi-display-fixture.jpg")
+
+# A rotation covering every screen, with the arguments the parametrised ones need
+DEFAULT_SPECS = (
+    "apod", "birthdays", "calendar", "date", "diagnostics", "image", "pi_health",
+    "pihole", "pihole_history", "speedtest", "stock:IGG.L", "watchlist:IGG.L,VUSA.L,AAPL,MSFT", "weather",
+)
+
+
+def timestamps(count, step):
+    """count evenly spaced Unix times ending at FIXTURE_TIME, step seconds apart."""
+    end = FIXTURE_TIME.timestamp()
+    return [end - (count - 1 - i) * step for i in range(count)]
+
+
+def walk(rng, count, start, spread, low=0):
+    """A random walk of count values, never below low."""
+    values, value = [], start
+    for _ in range(count):
+        value = max(low, value + rng.gauss(0, spread))
+        values.append(value)
+    return values
+
+
+# ----------------- Fixtures -----------------
+def apod(_):
+    """(image, title) like fetch_apod(), with a picture about the size NASA publishes."""
+    image = Image.effect_mandelbrot((1600, 1200), (-2.2, -1.2, 1.0, 1.2), 100)
+    return ImageOps.colorize(image, "#05051a", "#ffd080", mid="#3050c0"), "The Mandelbrot Set in False Colour"
+
+
+def birthdays(_):
+    return ["Ada Lovelace", "Alan Turing"]
+
+
+def calendar(_):
+    """Events in the shape the Google Calendar API returns them, one all day."""
+    day = FIXTURE_TIME.date()
+    return [
+        {"summary": "Dentist", "start": {"dateTime": f"{day}T15:30:00Z"}},
+        {"summary": "Bins out", "start": {"date": f"{day + timedelta(days=1)}"}},
+        {"summary": "Team standup", "start": {"dateTime": f"{day + timedelta(days=2)}T09:00:00Z"}},
+        {"summary": "Football", "start": {"dateTime": f"{day + timedelta(days=3)}T18:45:00Z"}},
+        {"summary": "Dinner with Sam", "start": {"dateTime": f"{day + timedelta(days=5)}T19:00:00Z"}},
+    ]
+
+
+def date(_):
+    return FIXTURE_TIME.date()
+
+
+def diagnostics(_):
+    """A timings file as Profiler.save() writes it."""
+    rng = random.Random(SEED)
+    screens = {}
+    for spec in DEFAULT_SPECS:
+        name = spec.partition(":")[0]
+        stages = {}
+        for stage, typical in (("fetch", 0.4), ("render", 0.15), ("quantise", 0.3), ("panel", 28)):
+            p50 = typical * rng.uniform(0.5, 1.5)
+            stages[stage] = {"count": 100, "last": p50, "p50": p50, "p95": p50 * 1.6, "max": p50 * 2.5}
+        screens[name] = stages
+    return {"updated": FIXTURE_TIME.timestamp(), "screens": screens}
+
+
+def image(_):
+    """Path to a camera sized photo, written the first time it is needed."""
+    if not os.path.exists(PHOTO_PATH):
+        photo = Image.effect_mandelbrot((750, 500), (-0.8, 0.05, -0.7, 0.12), 100).resize((3000, 2000))
+        ImageOps.colorize(photo, "black", "white", mid="#c05020").save(PHOTO_PATH, quality=90)
+    return PHOTO_PATH
+
+
+def pi_health(_):
+    """A day of samples every minute, as PiHealthScreen.fetch() returns them."""
+    rng = random.Random(SEED)
+    count = 24 * 60
+    times = timestamps(count, 60)
+    temps = walk(rng, count, 48, 0.6, low=35)
+    cpu = walk(rng, count, 12, 3, low=1)
+    ram = walk(rng, count, 42, 0.5, low=20)
+    samples = [
+        (times[i], temps[i], min(cpu[i], 100), min(ram[i], 100), 37.5 + i / count,
+         rng.uniform(2e4, 4e5), rng.uniform(1e4, 1e5), 0x50000 if i > count // 2 else 0)
+        for i in range(count)
+    ]
+    return {
+        "time": FIXTURE_TIME,
+        "samples": samples,
+        "ram": SimpleNamespace(total=4 * 1024 ** 3),
+        "disk": SimpleNamespace(total=32 * 1024 ** 3),
+    }
+
+
+def pihole(_):
+    """Stats as download_pihole_stats() returns them, with the API's 10 minute history."""
+    rng = random.Random(SEED)
+    history = [[int(ts), int(total), int(total * rng.uniform(0.1, 0.3))]
+               for ts, total in zip(timestamps(144, 600), walk(rng, 144, 300, 40, low=20))]
+    total, blocked = sum(h[1] for h in history), sum(h[2] for h in history)
+    return {
+        "ads_blocked": blocked,
+        "dns_queries": total,
+        "percentage_blocked": round(blocked / total * 100, 2),
+        "unique_clients": 14,
+        "domains_blocked": 162804,
+        "top_clients": [["living-room-tv", 10234], ["laptop", 6120], ["phone", 4418], ["pi-display", 990]],
+        "history": history,
+    }
+
+
+def pihole_history(_):
+    """A day of sampler records: time, queries and blocked queries so far, active clients."""
+    rng = random.Random(SEED)
+    records, queries, blocked = [], 40000, 7200
+    for ts, count in zip(timestamps(288, 300), walk(rng, 288, 140, 15, low=10)):
+        queries += int(count)
+        blocked += int(count * rng.uniform(0.1, 0.3))
+        records.append((ts, queries, blocked, 14))
+    return records
+
+
+def speedtest(_):
+    """A month of speedtest_runner.py results, twice a day."""
+    rng = random.Random(SEED)
+    return [
+        {
+            "timestamp": datetime.fromtimestamp(ts).isoformat(),
+            "download": round(rng.uniform(60, 75), 1),
+            "upload": round(rng.uniform(15, 20), 1),
+            "ping": round(rng.uniform(8, 20), 1),
+        }
+        for ts in timestamps(60, 12 * 3600)
+    ]
+
+
+def price_history(symbol, days=126):
+    """About 6 months of [timestamp ms, close] pairs on weekdays, different for each symbol."""
+    rng = random.Random(zlib.crc32(symbol.encode()))
+    end = FIXTURE_TIME.replace(tzinfo=timezone.utc)
+    dates = []
+    day = end
+    while len(dates) < days:
+        if day.weekday() < 5:
+            dates.append(day)
+        day -= timedelta(days=1)
+    closes = walk(rng, days, rng.uniform(50, 500), 3, low=1)
+    return [[int(d.timestamp() * 1000), round(c, 2)] for d, c in zip(reversed(dates), closes)]
+
+
+def stock(symbol):
+    """(latest close, change, history) like fetch_stock()."""
+    history = price_history(symbol)
+    return history[-1][1], history[-1][1] - history[-2][1], history
+
+
+def watchlist(symbols):
+    return [(symbol, price_history(symbol)) for symbol in symbols.split(",")]
+
+
+def weather(_):
+    """An Open-Meteo forecast for today and the next three days."""
+    days = [str(FIXTURE_TIME.date() + timedelta(days=i)) for i in range(4)]
+    return {
+        "current": {"temperature_2m": 11.4, "weathercode": 61, "windspeed_10m": 18.2, "precipitation": 0.4},
+        "daily": {
+            "time": days,
+            "temperature_2m_max": [12.1, 14.3, 9.8, 11.0],
+            "temperature_2m_min": [5.2, 6.8, 3.1, 4.4],
+            "precipitation_probability_max": [80, 35, 60, 10],
+            "weathercode": [61, 3, 71, 0],
+            "sunrise": [f"{day}T06:12" for day in days],
+            "sunset": [f"{day}T18:04" for day in days],
+        },
+    }
+
+
+FIXTURES = {
+    "apod": apod,
+    "birthdays": birthdays,
+    "calendar": calendar,
+    "date": date,
+    "diagnostics": diagnostics,
+    "image": image,
+    "pi_health": pi_health,
+    "pihole": pihole,
+    "pihole_history": pihole_history,
+    "speedtest": speedtest,
+    "stock": stock,
+    "watchlist": watchlist,
+    "weather": weather,
+}
+
+
+def offline_screen(spec):
+    """
+    Build the screen for a rotation entry with fetch() returning its fixture,
+    so it can be drawn with no network, credentials or sensors.
+    """
+    name, _, arg = spec.partition(":")
+    cls = screen_class(name)
+    data = FIXTURES[name](arg)
+    if name == "image":
+        arg = data  # ImageScreen needs a picture that exists, not a library
+
+    class OfflineScreen(cls):
+        def __init__(self):
+            super().__init__(*([arg] if arg else []))
+
+        def fetch(self):
+            return data
+
+    OfflineScreen.__name__ = f"Offline{cls.__name__}"
+    return OfflineScreen()
@@ -0,0 +1,41 @@
+import time
+from functools import lru_cache
+
+from PIL import ImageFont
+
+
+@lru_cache(maxsize=None)
+def get_font(path, size):
+    """
+    Drop-in for ImageFont.truetype(path, size) that loads each face once per
+    process and shares it between every render that asks for it.
+    """
+    return ImageFont.truetype(path, size)
+
+
+def warm_up(fonts):
+    """Load every (path, size) pair up front so the first render doesn't pay for it."""
+    for path, size in set(fonts):
+        get_font(path, size)
+
+
+def benchmark(fonts, repeat=5):
+    """
+    Time loading a screen's fonts from disk against fetching them from the
+    cache. Returns (uncached_ms, cached_ms) per render.
+    """
+    fonts = list(fonts)
+    warm_up(fonts)
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for path, size in fonts:
+            ImageFont.truetype(path, size)
+    uncached = (time.perf_counter() - start) * 1000 / repeat
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for path, size in fonts:
+            get_font(path, size)
+    cached = (time.perf_counter() - start) * 1000 / repeat
+    return uncached, cached
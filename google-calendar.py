@@ -4,17 +4,24 @@ import os.path
 import threading
 import os
 import sys
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
-from PIL import Image, ImageDraw, ImageFont
-from inky.auto import auto
+from PIL import ImageDraw
+from presenter import Presenter
+from screen import Screen, register
+from fonts import get_font
+from assets import get_background
+
+FONT_PATH = "./resources/fonts/Roboto-Medium.ttf"
 
 # Scopes for read-only access to your calendar
 SCOPES = ['https://www.googleapis.com/auth/calendar.readonly']
 
 def get_authenticated_service():
+    # The Google client libraries are slow to import, so only load them when needed
+    from google.auth.transport.requests import Request
+    from google.oauth2.credentials import Credentials
+    from google_auth_oauthlib.flow import InstalledAppFlow
+    from googleapiclient.discovery import build
+
     creds = None
     if os.path.exists("./creds/token.json"):
         creds = Credentials.from_authorized_user_file("./creds/token.json", SCOPES)
@@ -73,9 +80,8 @@ def get_calendar_events():
 
     if not service:
         print(f"Failed to authenticate with Google")
-        display_failure()
+        return None
 
-    
     # Get all calendar IDs
     all_calendars = service.calendarList().list().execute()
 
@@ -115,36 +121,43 @@ def get_calendar_events():
 
     return events
 
-def display_events():
-    message = []
-    events = get_calendar_events()
-    for event in events:
-        raw_start = event["start"].get("dateTime", event["start"].get("date"))
-        try:
-            # Parse the raw_start string into a datetime object
-            parsed_start = dt.datetime.strptime(raw_start, "%Y-%m-%dT%H:%M:%SZ")  # For dateTime format
-            formatted_start = parsed_start.strftime("%d-%b %H:%M")
-        except ValueError:
-            # Handle cases where the start date doesn't include time (e.g., "2025-01-24")
-            parsed_start = dt.datetime.strptime(raw_start, "%Y-%m-%d")  # For date format
-            formatted_start = parsed_start.strftime("%d-%b")
-    
-        event_summary = f"{formatted_start} \n {event['summary']}"
-        print(f"{formatted_start} - {event['summary']}")
-        message.append(event_summary)        
+@register
+class CalendarScreen(Screen):
+    """Upcoming events from every Google calendar on the account."""
 
-    try:
-        # Prepare the display
-        inky = auto()
-        img = Image.open("./resources/imgs/birthday-bg1-01.png")
+    name = "calendar"
+    ttl = 900
+    fonts = [(FONT_PATH, 25)]
+
+    def fetch(self):
+        return get_calendar_events()
+
+    def render(self, events, resolution):
+        message = []
+        for event in events:
+            raw_start = event["start"].get("dateTime", event["start"].get("date"))
+            try:
+                # Parse the raw_start string into a datetime object
+                parsed_start = dt.datetime.strptime(raw_start, "%Y-%m-%dT%H:%M:%SZ")  # For dateTime format
+                formatted_start = parsed_start.strftime("%d-%b %H:%M")
+            except ValueError:
+                # Handle cases where the start date doesn't include time (e.g., "2025-01-24")
+                parsed_start = dt.datetime.strptime(raw_start, "%Y-%m-%d")  # For date format
+                formatted_start = parsed_start.strftime("%d-%b")
+
+            event_summary = f"{formatted_start} \n {event['summary']}"
+            print(f"{formatted_start} - {event['summary']}")
+            message.append(event_summary)
+
+        # Prepare the background
+        img = get_background("./resources/imgs/birthday-bg1-01.png", resolution)
         draw = ImageDraw.Draw(img)
 
         # Set the message
         final_message = "\n".join(message)
 
-        # Font settings (update path to your font file)
-        font_path = "./resources/fonts/Roboto-Medium.ttf"
-        font = ImageFont.truetype(font_path, 25)
+        # Font settings (update FONT_PATH to change the font file)
+        font = get_font(FONT_PATH, 25)
 
         # Measure text size
         text_bbox = draw.multiline_textbbox((0, 0), final_message, font=font)
@@ -158,23 +171,27 @@ def display_events():
 
         # Draw the text on the image
         draw.multiline_text((x_position, y_position), final_message, font=font, align='center', fill=0)  # Black text
-        # Show on the Inky
-        inky.set_image(img)
-        inky.show()
+        return img
+
+
+def display_events():
+    try:
+        if not Presenter().present(CalendarScreen()):
+            display_failure()
         return 0
     except Exception as e:
         print(f"Error Displaying Events: {e}")
         return None
-    
+
+
 def display_failure():
-    # Prepare the display
-    inky = auto()
-    img = Image.open("./resources/imgs/birthday-bg1-01.png")
-    
-    # Show on the Inky
-    inky.set_image(img)
-    inky.show()
+    # Show the plain background on the Inky
+    presenter = Presenter()
+    presenter.show(get_background("./resources/imgs/birthday-bg1-01.png", presenter.resolution))
     return 0
 
 if __name__ == "__main__":
+    import headless
+
+    headless.main("calendar")  # With --headless this saves a PNG and exits
     display_events()
\ No newline at end of file
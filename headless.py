@@ -0,0 +1,99 @@
+import argparse
+import os
+import re
+import sys
+import time
+
+from display_manager import use_display
+from presenter import Presenter
+from screen import create_screen
+from virtual_display import PALETTES, VirtualInky, parse_resolution
+
+
+def add_arguments(parser):
+    """Add the options for rendering screens to PNG files instead of the panel."""
+    group = parser.add_argument_group("headless", "render to PNG files with no panel attached")
+    group.add_argument("--headless", action="store_true", help="save each screen as a PNG instead of showing it")
+    group.add_argument("--out", default="frames", help="directory for the PNGs (default: frames)")
+    group.add_argument("--resolution", type=parse_resolution, default=(640, 400), help="WIDTHxHEIGHT")
+    group.add_argument("--palette", choices=sorted(PALETTES), default="impression", help="colours of the display")
+    group.add_argument("--fixtures", action="store_true", help="draw made up data instead of fetching it")
+    group.add_argument("--batch", action="store_true", help="render the screens in parallel, one process per core")
+    group.add_argument("--jobs", type=int, default=os.cpu_count(), help="processes for --batch")
+    return parser
+
+
+def frame_path(out, spec):
+    return os.path.join(out, re.sub(r"[^\w.-]", "_", spec) + ".png")
+
+
+def render_to_file(spec, out, fixtures=False):
+    """
+    Fetch (or use the fixture for), draw and quantise one screen and save the
+    frame the panel would show. Returns (spec, path or None, seconds, error).
+    """
+    start = time.perf_counter()
+    try:
+        if fixtures:
+            from fixtures import offline_screen  # main.py imports this module on every start, so load it here
+
+            screen = offline_screen(spec)
+        else:
+            screen = create_screen(spec)
+        presenter = Presenter()
+        if not presenter.present(screen):
+            return spec, None, time.perf_counter() - start, "nothing to show"
+        path = frame_path(out, spec)
+        presenter.inky.frames[-1].save(path)
+        return spec, path, time.perf_counter() - start, None
+    except Exception as e:
+        return spec, None, time.perf_counter() - start, str(e)
+
+
+def render_all(specs, args):
+    """
+    Render every screen in specs to args.out on a VirtualInky, one after
+    another or with --batch across a pool of processes. Returns how many
+    failed.
+    """
+    os.makedirs(args.out, exist_ok=True)
+    inky = VirtualInky(args.resolution, args.palette)
+    jobs = [(spec, args.out, args.fixtures) for spec in specs]
+    processes = max(1, min(args.jobs, len(jobs))) if args.batch else 1
+
+    start = time.perf_counter()
+    if processes > 1:
+        import multiprocessing
+
+        with multiprocessing.Pool(processes, initializer=use_display, initargs=(inky,)) as pool:
+            results = pool.starmap(render_to_file, jobs)
+    else:
+        use_display(inky)
+        results = [render_to_file(*job) for job in jobs]
+    elapsed = time.perf_counter() - start
+
+    failed = 0
+    for spec, path, seconds, error in results:
+        if error:
+            failed += 1
+            print(f"{spec:<24} {seconds * 1000:8.0f} ms  failed: {error}")
+        else:
+            print(f"{spec:<24} {seconds * 1000:8.0f} ms  {path}")
+    rendered = len(results) - failed
+    print(
+        f"Rendered {rendered} of {len(results)} screens in {elapsed:.2f}s "
+        f"({rendered / elapsed:.1f} a second, {processes} process{'es' if processes > 1 else ''})"
+    )
+    return failed
+
+
+def main(*specs):
+    """
+    For a module's __main__: with --headless, render specs to PNG files and
+    exit, with a non-zero status if any failed. Otherwise return so the
+    module can show its screen on the panel as usual. Arguments the module
+    handles itself are ignored.
+    """
+    args, _ = add_arguments(argparse.ArgumentParser()).parse_known_args()
+    if args.headless:
+        sys.exit(1 if render_all(specs, args) else 0)
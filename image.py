@@ -1,31 +1,144 @@
 #!/usr/bin/env python3
 
+import argparse
+import os
 import sys
-import warnings
 
-from PIL import Image
+from PIL import ExifTags, Image, ImageOps
 
-from inky.auto import auto
+from display_manager import get_resolution, quantise
+from fit import fit_image, reduce_to, scaled_size
+from photos import PhotoLibrary
+from presenter import Presenter
+from screen import Screen, register
+
+# Largest image, in pixels, that will be held decoded in memory. JPEGs are
+# scaled down while decoding so they rarely get near this; anything that is
+# still bigger after that is refused rather than risk running a 512 MB Pi
+# out of memory. About 48 MB of RGB at the default.
+MAX_DECODE_PIXELS = 16_000_000
+
+# How pictures are fitted to the panel, one of fit.FIT_MODES
+FIT_MODE = "entropy"
+
+# EXIF orientations that turn the picture on its side
+ROTATED_ORIENTATIONS = (5, 6, 7, 8)
+
+
+def load_image(image_path, resolution, mode="stretch", max_pixels=MAX_DECODE_PIXELS):
+    """
+    Decode an image at roughly the size it will be shown at, the right way up,
+    and fit it to resolution. JPEGs are decoded straight to a 1/2, 1/4 or 1/8
+    scale, other formats are shrunk with a cheap reduce() before the final
+    resample.
+    """
+    resolution = tuple(resolution)
+    with Image.open(image_path) as image:
+        # Sideways photos are decoded sideways, so work out sizes the turned way round
+        orientation = image.getexif().get(ExifTags.Base.Orientation, 1)
+        rotated = orientation in ROTATED_ORIENTATIONS
+        size = image.size[::-1] if rotated else image.size
+        target = scaled_size(size, resolution, mode)
+        target = target[::-1] if rotated else target
+
+        image.draft("RGB", target)
+        width, height = image.size
+        if width * height > max_pixels:
+            raise ValueError(
+                f"{image_path} is {width}x{height} after scaled decoding, over the "
+                f"{max_pixels} pixel limit"
+            )
+
+        image = ImageOps.exif_transpose(reduce_to(image, target)).convert("RGB")
+
+    if image.size == resolution:
+        return image
+    return fit_image(image, resolution, mode)
+
+
+def prepare_photo(image_path, resolution):
+    """Panel-sized, palette-dithered copy of a photo for the photo library."""
+    return quantise(load_image(image_path, resolution, FIT_MODE), ImageScreen.saturation)
+
+
+@register
+class ImageScreen(Screen):
+    """The next picture from a shuffled photo library, or a single file."""
+
+    name = "image"
+    ttl = 600  # Notice newly prepared pictures; the shuffle only moves on when one is shown
+
+    def __init__(self, path):
+        self.path = path
+        self.library = None
+        if not os.path.isfile(path):
+            self.library = PhotoLibrary(path, get_resolution(), prepare_photo, variant=FIT_MODE)
+
+    def fetch(self):
+        if self.library is None:
+            return self.path
+        photo = self.library.next_photo()
+        if photo is None:
+            # Nothing prepared yet, e.g. the first run or a headless render, so draw one from the original
+            source = self.library.any_source()
+            if source is None:
+                print("No pictures to display")
+                return None
+            print(f"Now loading {source} to display (not prepared yet)")
+            return source
+        source, prepared = photo
+        print(f"Now loading {source} to display")
+        return prepared
+
+    def on_shown(self):
+        """Move to the next photo only once this one has been on the panel."""
+        if self.library is None:
+            return False
+        self.library.advance()
+        return True
+
+    def render(self, image_path, resolution):
+        return load_image(image_path, resolution, FIT_MODE)
 
 
 def display_image(image_path):
-    inky = auto()
-    saturation = 0.5
+    Presenter().present(ImageScreen(image_path))
+
+
+# ----------------- Benchmark -----------------
+def full_decode(image_path, resolution):
+    """The original loading path: decode every pixel, then resize."""
     with Image.open(image_path) as image:
-        resizedimage = image.resize(inky.resolution)
-        with warnings.catch_warnings():
-            warnings.filterwarnings("ignore", message="Busy Wait: Held high")
-            try:
-                inky.set_image(resizedimage, saturation=saturation)
-            except TypeError:
-                inky.set_image(resizedimage)
+        return image.resize(resolution)
+
 
-    inky.show()
+def benchmark(image_paths, resolution=(640, 400)):
+    """Print decode time and peak RSS growth of the full decode and load_image()."""
+    from bench import measure_in_child  # Only needed here, so the image screen doesn't load it
+    for image_path in image_paths:
+        with Image.open(image_path) as image:
+            print(f"{image_path} ({image.size[0]}x{image.size[1]} {image.format})")
+        for label, loader in (("full decode", full_decode), ("load_image", load_image)):
+            elapsed, peak_kb = measure_in_child(loader, image_path, resolution)
+            print(f"  {label:<12} {elapsed * 1000:8.1f} ms  {peak_kb / 1024:7.1f} MB peak RSS")
 
 
 if __name__ == "__main__":
-    if len(sys.argv) > 1:
-        image_path = sys.argv[1]  # Get the image path from the command-line argument
-        display_image(image_path)
-    else:
+    import headless
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("image_paths", nargs="*", help="image to display")
+    parser.add_argument(
+        "--benchmark", action="store_true",
+        help="compare decode time and memory of the given images instead of displaying",
+    )
+    headless.add_arguments(parser)
+    args = parser.parse_args()
+    if not args.image_paths:
         print("No image path provided!")
+    elif args.benchmark:
+        benchmark(args.image_paths)
+    elif args.headless:
+        sys.exit(1 if headless.render_all([f"image:{path}" for path in args.image_paths], args) else 0)
+    else:
+        display_image(args.image_paths[0])  # Get the image path from the command-line argument
@@ -1,109 +1,162 @@
-import os
-import random
-import logging
 import time
+
+STARTED = time.perf_counter()
+
+import argparse
+import asyncio
+import logging
 import sys
 from functools import partial
 from logging.handlers import RotatingFileHandler
-from apod import display_apod
-from stocks import fetch_and_display_stock
-from pihole import show_pihole_stats
-from birthdays import check_birthdays
-from date_display import get_date
-from weather import display_weather
-from pi_health import display_pi_health
-from speedtest_display import display_speedtest
-from image import display_image as show_image
-from clear import run_clear
-from gpiozero import Button
 
-# Button setup
-button_a = Button(5)
-button_b = Button(6)
-button_c = Button(16)
-button_d = Button(24)
+# Display modules aren't imported here, create_screen() imports each one the
+# first time its screen is used and their heavy dependencies wait until a fetch
+from clear import run_clear
+from display_manager import get_display, get_palette
+from fonts import benchmark
+from headless import add_arguments
+from presenter import Presenter
+from scheduler import Scheduler, run_blocking
+from screen import create_screen
+from snapshots import SnapshotStore
+
+# Button setup, each button is bound to one of the actions handled by the Scheduler
+BUTTON_ACTIONS = {
+    "a": "next",  # Skip to the next screen
+    "b": "picture",  # Jump to displaying a picture
+    "c": "refresh",  # Fetch and redraw the current screen
+    "d": "clear",  # Force a screen clean
+}
 
 # Paths
 image_dir = "/home/danny/Pictures"  # Change to your image directory
 LOG_FILE = "./pi-display.log"  # Error log location
 
+# Screens to cycle through, in order. Anything after a colon is passed to the screen.
+# How often each one refreshes its data and how long it stays up is set on its Screen class
+ROTATION = [
+    "pihole",
+    f"image:{image_dir}",
+    "stock:IGG.L",
+    "apod",
+    "birthdays",
+    "date",
+    "weather",
+    "pi_health",
+    "speedtest",
+]
+
+# Libraries slow enough to import that no screen should load them at startup
+HEAVY_MODULES = ("yfinance", "pandas", "numpy", "matplotlib", "requests", "psutil", "googleapiclient")
+
 # Log Rotation
 max_log_size = 5 * 1024 * 1024  # 5MB
 backup_count = 3  # Keep 3 logs
-handler = RotatingFileHandler(LOG_FILE, maxBytes=max_log_size, backupCount=backup_count)
-formatter = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
-handler.setFormatter(formatter)
 logger = logging.getLogger("display_logger")
-logger.setLevel(logging.DEBUG)
-logger.addHandler(handler)
 
 
-def screen_clear():
+def setup_logging():
+    """Send the log to LOG_FILE; only for runs that drive the panel, not reports or headless renders."""
+    handler = RotatingFileHandler(LOG_FILE, maxBytes=max_log_size, backupCount=backup_count)
+    handler.setFormatter(logging.Formatter("%(asctime)s - %(levelname)s - %(message)s"))
+    logger.setLevel(logging.DEBUG)
+    logger.addHandler(handler)
+
+
+def screen_clear(inky):
     try:
-        run_clear()
+        run_clear(inky_display=inky)
         return 0
     except Exception as e:
         logger.error(f"Failed to clear display: {e}", exc_info=True)
         return 1
 
 
-def display_image(image_path):
+def log_font_benchmark(screens):
+    """Log how long each screen's fonts take to load from disk against the font cache."""
+    for screen in screens:
+        if screen.fonts:
+            uncached, cached = benchmark(screen.fonts)
+            logger.info(f"Fonts for {screen.name}: {uncached:.1f} ms uncached, {cached:.3f} ms cached per render")
+
+
+async def after_first_frame(scheduler, screens):
+    await scheduler.first_shown.wait()
+    logger.info(f"First frame on the panel {time.perf_counter() - STARTED:.2f}s after start")
+    await run_blocking(log_font_benchmark, screens)
+
+
+def startup_report(top=15):
+    """
+    Print what importing main.py and the rotation's screen modules costs in a
+    fresh interpreter, in the style of python -X importtime.
+    """
+    from bench import import_times  # Only needed for the report, so normal starts don't load it
+
+    code = "import main, screen; [screen.screen_class(s.partition(':')[0]) for s in main.ROTATION]"
+    total, modules = import_times(code)
+    # Top-level imports and whatever they imported directly, slowest first
+    direct = sorted((m for m in modules if m[3] <= 1), key=lambda m: m[2], reverse=True)
+
+    print(f"Interpreter start and imports: {total * 1000:.0f} ms")
+    print(f"{'cumulative':>12} {'self':>10}  module")
+    for name, self_s, cumulative_s, _ in direct[:top]:
+        print(f"{cumulative_s * 1000:9.1f} ms {self_s * 1000:7.1f} ms  {name}")
+
+    imported = {m[0] for m in modules}
+    eager = [name for name in HEAVY_MODULES if name in imported]
+    deferred = [name for name in HEAVY_MODULES if name not in imported]
+    print(f"Deferred until first use: {', '.join(deferred) or 'none'}")
+    if eager:
+        print(f"Imported at startup: {', '.join(eager)}")
+
+
+async def run():
+    from buttons import ButtonDispatcher  # Needs gpiozero, so only when driving a real panel
+
+    # Detect the panel once; every screen shares this driver
+    presenter = Presenter(get_display())
+    resolution = presenter.resolution
+    logger.info(f"Detected display {resolution[0]}x{resolution[1]}, colours: {', '.join(get_palette())}")
+    display_screens = [create_screen(spec) for spec in ROTATION]
+
+    buttons = ButtonDispatcher(asyncio.get_running_loop(), BUTTON_ACTIONS)
+    scheduler = Scheduler(
+        display_screens,
+        presenter,
+        buttons,
+        clear=partial(screen_clear, presenter.inky),
+        snapshots=SnapshotStore(),
+    )
+    # Fonts load as each screen first renders; log what the cache saves once the first frame is up
+    report = asyncio.create_task(after_first_frame(scheduler, display_screens))
     try:
-        print(f"Now loading {image_path} to display")
-        show_image(image_path)
-    except Exception as e:
-        logger.error(f"Failed to display image: {e}", exc_info=True)
+        await scheduler.run()
+    finally:
+        report.cancel()
+        buttons.close()
 
 
 # Main loop
 def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--startup-report", action="store_true", help="show what each import costs at startup and exit"
+    )
+    add_arguments(parser)
+    args = parser.parse_args()
+    if args.startup_report:
+        startup_report()
+        return
+    if args.headless:
+        from headless import render_all
+
+        sys.exit(1 if render_all(ROTATION, args) else 0)
+
+    setup_logging()
     logger.info("Starting main loop")
     try:
-        image_files = [
-            os.path.join(image_dir, f)
-            for f in os.listdir(image_dir)
-            if f.endswith((".png", ".jpg", ".jpeg"))
-        ]
-        display_functions = [
-            show_pihole_stats,
-            lambda: display_image(random.choice(image_files)),
-            partial(fetch_and_display_stock, "IGG.L"),
-            display_apod,
-            check_birthdays,
-            get_date,
-            display_weather,
-            display_pi_health,
-            display_speedtest,
-        ]
-
-        current_index = 0
-
-        while True:
-            try:
-                print(f"Calling index {current_index}")
-                print(f"Display function {display_functions[current_index]}")
-                display_functions[current_index]()
-
-                # Wait for 20 minutes or button press
-                start_time = time.time()
-                while time.time() - start_time < 1200:  # 20 minutes
-                    if button_a.is_pressed:
-                        print("Skipping to next function")
-                        break
-                    elif button_b.is_pressed:
-                        current_index = 0
-                        print("Jumping to displaying a picture")
-                        break
-                    elif button_d.is_pressed:
-                        print("Forcing a screen clean")
-                        screen_clear()
-                        break
-                    time.sleep(0.1)  # Check button press every 100ms
-
-                current_index = (current_index + 1) % len(display_functions)
-            except Exception as e:
-                logger.error(f"Error during display function: {e}", exc_info=True)
-                current_index = (current_index + 1) % len(display_functions)
+        asyncio.run(run())
 
     except KeyboardInterrupt:
         logger.info("Process interrupted by user")
@@ -0,0 +1,167 @@
+import hashlib
+import json
+import os
+import queue
+import random
+import threading
+
+from atomic import write_json_atomic
+
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".pi-display", "photos")
+MANIFEST_FILE = "manifest.json"
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg")
+
+
+class PhotoLibrary:
+    """
+    Index of the photos in a directory with a panel-sized copy of each.
+
+    The directory is rescanned whenever its mtime changes, so new photos are
+    picked up without a restart. New or changed photos are handed to a
+    background worker which calls prepare(path, resolution) and saves the
+    result in CACHE_DIR, and a JSON manifest records which source each copy
+    was made from. variant names anything else that changes how prepare()
+    works, such as the fit mode, so changing it re-prepares every photo.
+    Photos come out in shuffled order without repeats until every prepared
+    photo has been shown once.
+    """
+
+    def __init__(self, image_dir, resolution, prepare, variant="", cache_dir=CACHE_DIR):
+        self.image_dir = image_dir
+        self.resolution = tuple(resolution)
+        self.prepare = prepare
+        self.variant = variant
+        self.cache_dir = cache_dir
+        self.manifest_path = os.path.join(cache_dir, MANIFEST_FILE)
+        os.makedirs(cache_dir, exist_ok=True)
+
+        self.lock = threading.Lock()
+        self.manifest = self.load_manifest()  # source path -> entry
+        self.dir_mtime = None
+        self.sources = {}  # source path -> mtime, as of the last scan
+        self.bag = []
+        self.last_shown = None
+
+        self.pending = queue.Queue()
+        self.worker = threading.Thread(target=self.work, name="photo-library", daemon=True)
+        self.worker.start()
+        self.scan()
+
+    # ----------------- Manifest -----------------
+    def load_manifest(self):
+        try:
+            with open(self.manifest_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save_manifest(self):
+        with self.lock:
+            manifest = dict(self.manifest)
+        write_json_atomic(self.manifest_path, manifest)
+
+    def cached_name(self, source):
+        digest = hashlib.sha1(source.encode()).hexdigest()[:16]
+        suffix = f"-{self.variant}" if self.variant else ""
+        return f"{digest}-{self.resolution[0]}x{self.resolution[1]}{suffix}.png"
+
+    def is_current(self, source, mtime):
+        entry = self.manifest.get(source)
+        return (
+            entry is not None
+            and entry["mtime"] == mtime
+            and tuple(entry["resolution"]) == self.resolution
+            and entry.get("variant", "") == self.variant
+            and os.path.exists(os.path.join(self.cache_dir, entry["file"]))
+        )
+
+    # ----------------- Scanning -----------------
+    def scan(self):
+        """Rescan the directory if it has changed, queueing anything new for the worker."""
+        try:
+            dir_mtime = os.stat(self.image_dir).st_mtime
+        except OSError as e:
+            print(f"Photo library: cannot read {self.image_dir}: {e}")
+            return
+        if dir_mtime == self.dir_mtime:
+            return
+        self.dir_mtime = dir_mtime
+
+        sources = {}
+        with os.scandir(self.image_dir) as entries:
+            for entry in entries:
+                if entry.is_file() and entry.name.lower().endswith(IMAGE_EXTENSIONS):
+                    sources[entry.path] = entry.stat().st_mtime
+
+        with self.lock:
+            self.sources = sources
+            removed = [source for source in self.manifest if source not in sources]
+            for source in removed:
+                entry = self.manifest.pop(source)
+                try:
+                    os.remove(os.path.join(self.cache_dir, entry["file"]))
+                except OSError:
+                    pass
+            stale = [s for s, mtime in sources.items() if not self.is_current(s, mtime)]
+        if removed:
+            self.save_manifest()
+        for source in stale:
+            self.pending.put((source, sources[source]))
+        if stale:
+            print(f"Photo library: {len(stale)} photos to prepare")
+
+    # ----------------- Worker -----------------
+    def work(self):
+        while True:
+            source, mtime = self.pending.get()
+            try:
+                self.add(source, mtime)
+            except Exception as e:
+                print(f"Photo library: failed to prepare {source}: {e}")
+
+    def add(self, source, mtime):
+        """Prepare a panel-sized copy of one photo and record it in the manifest."""
+        name = self.cached_name(source)
+        image = self.prepare(source, self.resolution)
+        image.save(os.path.join(self.cache_dir, name))
+        with self.lock:
+            self.manifest[source] = {
+                "mtime": mtime,
+                "resolution": list(self.resolution),
+                "variant": self.variant,
+                "file": name,
+            }
+        self.save_manifest()
+
+    # ----------------- Picking -----------------
+    def next_photo(self):
+        """
+        Return (source, prepared file) for the photo at the front of the
+        shuffle, or None if nothing has been prepared yet. The same photo is
+        returned until advance() is called.
+        """
+        self.scan()
+        with self.lock:
+            ready = dict(self.manifest)
+            self.bag = [source for source in self.bag if source in ready]
+            if not self.bag:
+                self.bag = list(ready)
+                random.shuffle(self.bag)
+                # Don't show the same photo twice in a row across reshuffles
+                if len(self.bag) > 1 and self.bag[-1] == self.last_shown:
+                    self.bag[0], self.bag[-1] = self.bag[-1], self.bag[0]
+            if not self.bag:
+                return None
+            source = self.bag[-1]
+            return source, os.path.join(self.cache_dir, ready[source]["file"])
+
+    def any_source(self):
+        """A random photo from the directory, prepared or not, or None if it has none."""
+        with self.lock:
+            return random.choice(list(self.sources)) if self.sources else None
+
+    def advance(self):
+        """Mark the photo at the front of the shuffle as shown, so next_photo() moves on."""
+        with self.lock:
+            if self.bag:
+                self.last_shown = self.bag.pop()
@@ -1,10 +1,31 @@
-import psutil
-from PIL import Image, ImageDraw, ImageFont
-from inky.auto import auto
+import math
+import os
+import subprocess
+import threading
+import time
+from functools import lru_cache
+from PIL import Image, ImageDraw
+from presenter import Presenter
+from screen import Screen, register
+from fonts import get_font
+from charts import BLACK, BLUE, RED, draw_sparkline
+from ringbuffer import RingBuffer
 from datetime import datetime
 
 FONT_PATH = "./resources/fonts/Roboto-Medium.ttf"
 TEMP_FILE = "/sys/class/thermal/thermal_zone0/temp"
+THROTTLED_FILE = "/sys/devices/platform/soc/soc:firmware/get_throttled"
+
+# The sampler records a sample every SAMPLE_INTERVAL seconds and keeps HISTORY_HOURS of them
+SAMPLE_INTERVAL = 60
+HISTORY_HOURS = 24
+SAMPLES_FILE = os.path.join(os.path.expanduser("~"), ".pi-display", "health-samples.bin")
+# time, CPU temp (NaN if unknown), CPU %, RAM %, disk %, network in and out (bytes/s), throttled flags
+SAMPLE_FORMAT = "<dffffffI"
+
+# Bits of the firmware's get_throttled value that are set while each problem is happening;
+# the same bits 16 higher stay set once it has happened since boot
+THROTTLE_FLAGS = {0: "under-voltage", 1: "frequency capped", 2: "throttled", 3: "soft temp limit"}
 
 
 def get_cpu_temp():
@@ -15,97 +36,227 @@ def get_cpu_temp():
         return None
 
 
+def get_throttled():
+    """The firmware's throttling flags, or 0 if they can't be read (e.g. not on a Pi)."""
+    try:
+        with open(THROTTLED_FILE) as f:
+            return int(f.read().strip(), 16)
+    except (OSError, ValueError):
+        pass
+    try:
+        result = subprocess.run(["vcgencmd", "get_throttled"], capture_output=True, text=True, timeout=5)
+        return int(result.stdout.strip().split("=")[1], 16)
+    except (OSError, IndexError, ValueError, subprocess.SubprocessError):
+        return 0
+
+
+def describe_throttled(flags, earlier=True):
+    """What is limiting the Pi now, or OK; with earlier, what has limited it since boot too."""
+    now = [name for bit, name in THROTTLE_FLAGS.items() if flags & (1 << bit)]
+    if now:
+        return ", ".join(now)
+    earlier = earlier and [name for bit, name in THROTTLE_FLAGS.items() if flags & (1 << (bit + 16))]
+    if earlier:
+        return "OK (earlier: " + ", ".join(earlier) + ")"
+    return "OK"
+
+
 def fmt_bytes(b):
     return round(b / (1024 ** 3), 1)
 
 
-def display_pi_health():
-    try:
-        inky = auto()
-        width, height = inky.resolution
+def fmt_rate(bytes_per_sec):
+    return f"{bytes_per_sec * 8 / 1e6:.1f} Mbps"
+
+
+class HealthSampler:
+    """
+    Background thread that records this Pi's health into a RingBuffer every
+    interval seconds. CPU usage is measured over the whole interval and
+    network throughput from the change in byte counters, so taking a sample
+    never sleeps and the screen only has to read the buffer.
+    """
+
+    def __init__(self, path=SAMPLES_FILE, interval=SAMPLE_INTERVAL, hours=HISTORY_HOURS):
+        self.interval = interval
+        self.samples = RingBuffer(path, SAMPLE_FORMAT, int(hours * 3600 // interval))
+        self.lock = threading.Lock()
+        self.last_net = self.last_time = None
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, name="health-sampler", daemon=True)
+        self.thread.start()
+
+    def prime(self):
+        """Start the CPU usage and network counters that each sample is measured from."""
+        import psutil  # Deferred so startup doesn't pay for it
+
+        with self.lock:
+            if self.last_net is None:
+                psutil.cpu_percent(interval=None)
+                self.last_net, self.last_time = psutil.net_io_counters(), time.time()
+
+    def sample(self):
+        """Record one sample, with CPU usage and network rates since the previous one."""
+        import psutil
+
+        self.prime()
+        with self.lock:
+            now, net = time.time(), psutil.net_io_counters()
+            elapsed = max(now - self.last_time, 1e-6)
+            cpu_temp = get_cpu_temp()
+            self.samples.append(
+                now,
+                math.nan if cpu_temp is None else cpu_temp,
+                psutil.cpu_percent(interval=None),
+                psutil.virtual_memory().percent,
+                psutil.disk_usage("/").percent,
+                max(0, net.bytes_recv - self.last_net.bytes_recv) / elapsed,
+                max(0, net.bytes_sent - self.last_net.bytes_sent) / elapsed,
+                get_throttled(),
+            )
+            self.last_net, self.last_time = net, now
+
+    def run(self):
+        self.prime()
+        wait = 1  # First sample straight away so the screen has something to show
+        while not self.stopped.wait(wait):
+            wait = self.interval
+            try:
+                self.sample()
+            except Exception as e:
+                print(f"Health sample failed: {e}")
+
+    def stop(self):
+        self.stopped.set()
+
+
+@lru_cache(maxsize=None)
+def get_sampler():
+    """The one HealthSampler, started on first use."""
+    return HealthSampler()
+
+
+@register
+class PiHealthScreen(Screen):
+    """CPU temperature and usage, RAM and disk for this Pi, now and over the last day."""
+
+    name = "pi_health"
+    ttl = 300
+    fonts = [(FONT_PATH, size) for size in (32, 28, 40, 20, 18)]
+
+    def fetch(self):
+        """
+        The sampler's history plus current RAM and disk totals; nothing here
+        waits. The sampler starts the first time this runs, not at startup.
+        """
+        import psutil
+
+        sampler = get_sampler()
+        since = time.time() - HISTORY_HOURS * 3600
+        samples = sampler.samples.since(since)
+        if not samples:
+            # Nothing recorded lately (first run, or the Pi was off), take a sample now rather than show nothing
+            sampler.sample()
+            samples = sampler.samples.since(since)
+        if not samples:
+            return None
+        return {
+            "time": datetime.now(),
+            "samples": samples,
+            "ram": psutil.virtual_memory(),
+            "disk": psutil.disk_usage("/"),
+        }
+
+    def render(self, stats, resolution):
+        width, height = resolution
 
         image = Image.new("RGB", (width, height), "white")
         draw = ImageDraw.Draw(image)
 
-        font_header = ImageFont.truetype(FONT_PATH, 32)
-        font_label = ImageFont.truetype(FONT_PATH, 28)
-        font_value = ImageFont.truetype(FONT_PATH, 58)
-        font_sub = ImageFont.truetype(FONT_PATH, 24)
+        font_header = get_font(FONT_PATH, 32)
+        font_label = get_font(FONT_PATH, 28)
+        font_value = get_font(FONT_PATH, 40)
+        font_sub = get_font(FONT_PATH, 20)
+        font_footer = get_font(FONT_PATH, 18)
 
         # Header
         draw.text((20, 16), "Pi Health", font=font_header, fill="black")
-        now_str = datetime.now().strftime("%d %b %H:%M")
+        now_str = stats["time"].strftime("%d %b %H:%M")
         bbox = draw.textbbox((0, 0), now_str, font=font_label)
         draw.text((width - (bbox[2] - bbox[0]) - 20, 18), now_str, font=font_label, fill="black")
 
         draw.line([(20, 62), (width - 20, 62)], fill="black", width=2)
 
-        # Gather stats
-        cpu_temp = get_cpu_temp()
-        cpu_pct = psutil.cpu_percent(interval=1)
-        ram = psutil.virtual_memory()
-        disk = psutil.disk_usage("/")
+        samples = stats["samples"]
+        latest = samples[-1]
+        ram = stats["ram"]
+        disk = stats["disk"]
 
-        temp_str = f"{cpu_temp}°C" if cpu_temp is not None else "N/A"
-        cpu_str = f"{cpu_pct}%"
-        ram_str = f"{ram.percent}%"
-        ram_sub = f"{fmt_bytes(ram.used)} / {fmt_bytes(ram.total)} GB"
-        disk_str = f"{disk.percent}%"
-        disk_sub = f"{fmt_bytes(disk.used)} / {fmt_bytes(disk.total)} GB"
+        # Network and throttling along the bottom
+        footer_h = 30
+        power = f"Power/thermal: {describe_throttled(latest[7])}"
+        # Shorten then drop the network before what happened earlier if the footer would run off the panel
+        for footer in (
+            f"Net in {fmt_rate(latest[5])}, out {fmt_rate(latest[6])}    {power}",
+            f"Net {latest[5] * 8 / 1e6:.1f}/{fmt_rate(latest[6])}    {power}",
+            power,
+            f"Power/thermal: {describe_throttled(latest[7], earlier=False)}",
+        ):
+            if draw.textlength(footer, font=font_footer) <= width - 40:
+                break
+        fill = RED if latest[7] & 0xF else BLACK
+        draw.text((20, height - footer_h + 4), footer, font=font_footer, fill=fill)
 
         # Grid lines first (drawn behind text)
+        grid_bottom = height - footer_h
         mid_x = width // 2
-        mid_y = 62 + (height - 62) // 2  # vertical midpoint of content area
-        draw.line([(mid_x, 70), (mid_x, height - 10)], fill="black", width=1)
+        mid_y = 62 + (grid_bottom - 62) // 2  # vertical midpoint of content area
+        draw.line([(mid_x, 70), (mid_x, grid_bottom - 6)], fill="black", width=1)
         draw.line([(20, mid_y), (width - 20, mid_y)], fill="black", width=1)
+        draw.line([(20, grid_bottom), (width - 20, grid_bottom)], fill="black", width=1)
 
-        # 2x2 grid — centre content in each quadrant
         col_w = width // 2
-        row_h = (height - 62) // 2
-
-        def draw_cell(label, value, sub, col, row):
-            # Quadrant bounds
-            qx = col * col_w
-            qy = 62 + row * row_h
-
-            # Measure total content block height
-            lh = draw.textbbox((0, 0), label, font=font_label)
-            vh = draw.textbbox((0, 0), value, font=font_value)
-            label_h = lh[3] - lh[1]
-            value_h = vh[3] - vh[1]
-            gap = 6
-            sub_gap = 18
-            block_h = label_h + gap + value_h
-            if sub:
-                sh = draw.textbbox((0, 0), sub, font=font_sub)
-                block_h += sub_gap + (sh[3] - sh[1])
-
-            # Vertical start to centre block in quadrant
-            ty = qy + (row_h - block_h) // 2
-
-            def draw_centred(text, font, y):
-                b = draw.textbbox((0, 0), text, font=font)
-                tx = qx + (col_w - (b[2] - b[0])) // 2
-                draw.text((tx, y), text, font=font, fill="black")
-
-            draw_centred(label, font_label, ty)
-            ty += label_h + gap
-            draw_centred(value, font_value, ty)
-            if sub:
-                ty += value_h + sub_gap
-                draw_centred(sub, font_sub, ty)
-
-        draw_cell("CPU Temp",  temp_str, None,    col=0, row=0)
-        draw_cell("CPU Usage", cpu_str,  None,    col=1, row=0)
-        draw_cell("RAM",       ram_str,  ram_sub, col=0, row=1)
-        draw_cell("Disk",      disk_str, disk_sub, col=1, row=1)
-
-        inky.set_image(image)
-        inky.show()
+        row_h = (grid_bottom - 62) // 2
 
+        def draw_cell(label, index, unit, col, row, note=None):
+            """Label, latest value, min/avg/max and a sparkline of one field of the samples."""
+            values = [s[index] for s in samples if not math.isnan(s[index])]
+            qx = col * col_w + 16
+            qy = 62 + row * row_h + 6
+            right = (col + 1) * col_w - 16
+
+            draw.text((qx, qy), label, font=font_label, fill="black")
+            if note:
+                b = draw.textbbox((qx, qy), label, font=font_label)
+                draw.text((b[2] + 6, qy + 6), note, font=font_sub, fill="black")
+            if not values:
+                draw.text((qx, qy + 36), "N/A", font=font_value, fill="black")
+                return
+            value = f"{values[-1]:.1f}{unit}"
+            b = draw.textbbox((0, 0), value, font=font_value)
+            draw.text((right - (b[2] - b[0]), qy - 4), value, font=font_value, fill="black")
+
+            summary = f"min {min(values):.0f}  avg {sum(values) / len(values):.0f}  max {max(values):.0f}{unit}"
+            draw.text((qx, qy + 42), summary, font=font_sub, fill="black")
+            draw_sparkline(draw, (qx + 4, qy + 74, right - 4, qy + row_h - 18), values, colour=BLUE)
+
+        draw_cell("CPU Temp", 1, "°C", col=0, row=0)
+        draw_cell("CPU Usage", 2, "%", col=1, row=0)
+        draw_cell("RAM", 3, "%", col=0, row=1, note=f"of {fmt_bytes(ram.total)} GB")
+        draw_cell("Disk", 4, "%", col=1, row=1, note=f"of {fmt_bytes(disk.total)} GB")
+
+        return image
+
+
+def display_pi_health():
+    try:
+        Presenter().present(PiHealthScreen())
     except Exception as e:
         print(f"Pi health: render failed: {e}")
 
 
 if __name__ == "__main__":
+    import headless
+
+    headless.main("pi_health")  # With --headless this saves a PNG and exits
     display_pi_health()
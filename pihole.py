@@ -1,25 +1,117 @@
-import requests
-from PIL import Image, ImageDraw, ImageFont
-from inky.auto import auto
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from functools import lru_cache
+from PIL import Image, ImageDraw
+from presenter import Presenter
+from screen import Screen, register
+from fonts import get_font
+from assets import get_background
+from fetch_cache import cached_fetch, max_age
+from charts import BLACK, BLUE, RED, draw_line_chart
+from ringbuffer import RingBuffer
 
+FONT_PATH = "./resources/fonts/Roboto-Medium.ttf"
 
-def get_sid(api_url, password):
-    resp = requests.post(f"{api_url}/api/auth", json={"password": password}, timeout=10)
-    resp.raise_for_status()
-    data = resp.json()
-    return data["session"]["sid"]
+API_URL = "http://192.168.1.110"
+
+# Just under the screen's ttl, so every refresh gets new stats
+PIHOLE_EXPIRY = max_age(4 * 60)
+TOP_CLIENTS = 4  # How many of the busiest clients to list
+
+# The sampler records the summary every SAMPLE_INTERVAL seconds, keeping a day of samples
+SAMPLE_INTERVAL = 5 * 60
+SAMPLES_FILE = os.path.join(os.path.expanduser("~"), ".pi-display", "pihole-samples.bin")
+SAMPLE_FORMAT = "<dIIH"  # time, queries and blocked queries in the previous 24 hours, active clients
+
+
+class PiholeClient:
+    """
+    A logged-in session with the Pi-hole v6 API.
+
+    Pi-hole only allows a few sessions at once, so the session ID is kept and
+    reused until it times out, and the client only logs in again when the
+    API answers 401. Requests share one pooled requests.Session, so the
+    connection is kept alive between them, and get_many() fetches several
+    endpoints in parallel.
+    """
+
+    def __init__(self, api_url, password, timeout=10):
+        import requests  # Deferred so startup doesn't pay for it
+        from requests.adapters import HTTPAdapter
+
+        self.api_url = api_url
+        self.password = password
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.mount(api_url, HTTPAdapter(pool_connections=1, pool_maxsize=4))
+        self.sid = None
+        self.sid_expires = 0
+        self.validity = 300  # Seconds a session lasts without use, updated at login
+        self.lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="pihole")
+
+    def login(self):
+        """Start a new session, replacing the current one."""
+        resp = self.session.post(
+            f"{self.api_url}/api/auth", json={"password": self.password}, timeout=self.timeout
+        )
+        resp.raise_for_status()
+        session = resp.json()["session"]
+        self.sid = session["sid"]
+        self.validity = session.get("validity", 300)
+        self.sid_expires = time.time() + self.validity
+        print("Logged in to Pi-hole")
+
+    def current_sid(self, rejected=None):
+        """The session ID to use, logging in first if there isn't a live one or it was rejected."""
+        with self.lock:
+            # Parallel requests can all be rejected; only the first of them logs in again
+            if self.sid is None or self.sid == rejected or time.time() >= self.sid_expires:
+                self.login()
+            return self.sid
+
+    def get(self, path, **params):
+        """GET an API path and return its JSON, logging in again once if the session has gone."""
+        sid = self.current_sid()
+        for attempt in range(2):
+            resp = self.session.get(
+                f"{self.api_url}{path}", headers={"X-FTL-SID": sid}, params=params, timeout=self.timeout
+            )
+            if resp.status_code == 401 and attempt == 0:
+                sid = self.current_sid(rejected=sid)
+                continue
+            resp.raise_for_status()
+            # Every request pushes the session's timeout back
+            self.sid_expires = time.time() + self.validity
+            return resp.json()
+
+    def get_many(self, *paths):
+        """GET several API paths at once; returns {path: JSON}."""
+        futures = {path: self.executor.submit(self.get, path) for path in paths}
+        return {path: future.result() for path, future in futures.items()}
+
+
+@lru_cache(maxsize=None)
+def get_client(api_url, password):
+    """The shared PiholeClient for an instance, so every caller reuses its session."""
+    return PiholeClient(api_url, password)
 
 
 def fetch_pihole_stats(api_url, password):
-    try:
-        sid = get_sid(api_url, password)
-        headers = {"X-FTL-SID": sid}
+    """Stats from the Pi-hole, or the last ones fetched if it can't be reached."""
+    return cached_fetch(
+        f"pihole:{api_url}", lambda: download_pihole_stats(get_client(api_url, password)), PIHOLE_EXPIRY
+    )
 
-        stats_url = f"{api_url}/api/stats/summary"
-        response = requests.get(stats_url, headers=headers, timeout=10)
-        response.raise_for_status()
 
-        data = response.json()
+def download_pihole_stats(client):
+    """Today's totals, the top clients and the last 24 hours of queries in one round of parallel requests."""
+    try:
+        responses = client.get_many("/api/stats/summary", "/api/stats/top_clients", "/api/history")
+        data = responses["/api/stats/summary"]
 
         return {
             "ads_blocked": data.get("queries", {}).get("blocked", "N/A"),
@@ -31,6 +123,14 @@ def fetch_pihole_stats(api_url, password):
             "domains_blocked": data.get("gravity", {}).get(
                 "domains_being_blocked", "N/A"
             ),
+            "top_clients": [
+                [client.get("name") or client.get("ip", "?"), client.get("count", 0)]
+                for client in responses["/api/stats/top_clients"].get("clients", [])[:TOP_CLIENTS]
+            ],
+            "history": [
+                [entry["timestamp"], entry.get("total", 0), entry.get("blocked", 0)]
+                for entry in responses["/api/history"].get("history", [])
+            ],
         }
 
     except Exception as e:
@@ -38,6 +138,62 @@ def fetch_pihole_stats(api_url, password):
         return None
 
 
+class PiholeSampler:
+    """
+    Background thread that records the Pi-hole summary into a RingBuffer
+    every interval seconds, so a day of history is always on disk and
+    drawing it never needs the network.
+    """
+
+    def __init__(self, client, path=SAMPLES_FILE, interval=SAMPLE_INTERVAL):
+        self.client = client
+        self.interval = interval
+        self.samples = RingBuffer(path, SAMPLE_FORMAT, int(24 * 3600 // interval))
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, name="pihole-sampler", daemon=True)
+        self.thread.start()
+
+    def sample(self):
+        data = self.client.get("/api/stats/summary")
+        queries = data.get("queries", {})
+        self.samples.append(
+            time.time(),
+            queries.get("total", 0),
+            queries.get("blocked", 0),
+            data.get("clients", {}).get("active", 0),
+        )
+
+    def run(self):
+        while not self.stopped.is_set():
+            try:
+                self.sample()
+            except Exception as e:
+                print(f"Pi-hole sample failed: {e}")
+            self.stopped.wait(self.interval)
+
+    def stop(self):
+        self.stopped.set()
+
+
+@lru_cache(maxsize=None)
+def get_sampler(api_url, password):
+    """The one PiholeSampler for an instance, started on first use."""
+    return PiholeSampler(get_client(api_url, password))
+
+
+def per_interval(samples):
+    """
+    (time, queries, blocked) handled between each sample and the one before,
+    from the totals the sampler records. A total that went down means FTL
+    restarted, so that interval can't be counted and is left out.
+    """
+    counts = []
+    for (_, q0, b0, _), (ts, q1, b1, _) in zip(samples, samples[1:]):
+        if q1 >= q0 and b1 >= b0:
+            counts.append((ts, q1 - q0, b1 - b0))
+    return counts
+
+
 def load_password():
     password_path = "./creds/pihole-api.txt"
     try:
@@ -48,13 +204,33 @@ def load_password():
         return None
 
 
-def display_pihole_stats(stats):
-    inky = auto()
-    with Image.open("./resources/imgs/pihole-bg1-01.png") as img:
+@register
+class PiholeScreen(Screen):
+    """Today's query and blocking totals from the Pi-hole API."""
+
+    name = "pihole"
+    ttl = 300  # Stats change constantly
+    fonts = [(FONT_PATH, 28), (FONT_PATH, 18), (FONT_PATH, 14)]
+
+    def fetch(self):
+        password = load_password()
+
+        if not password:
+            print("Pi-hole password missing. Exiting.")
+            return None
+
+        stats = fetch_pihole_stats(API_URL, password)
+        if not stats:
+            print("Failed to display Pi-hole stats.")
+        return stats
+
+    def render(self, stats, resolution):
+        img = get_background("./resources/imgs/pihole-bg1-01.png", resolution)
         draw = ImageDraw.Draw(img)
+        width, height = img.size
 
-        font_path = "./resources/fonts/Roboto-Medium.ttf"
-        font = ImageFont.truetype(font_path, 45)
+        font = get_font(FONT_PATH, 28)
+        font_small = get_font(FONT_PATH, 18)
 
         stats_text = (
             f"Unique Clients: {stats['unique_clients']}\n"
@@ -63,38 +239,88 @@ def display_pihole_stats(stats):
             f"Domains Blocked: {stats['domains_blocked']}\n"
             f"Blocked: {stats['percentage_blocked']}%"
         )
+        draw.multiline_text((20, 64), stats_text, font=font, spacing=6, fill=0)
 
-        text_bbox = draw.multiline_textbbox((0, 0), stats_text, font=font)
-        text_width = text_bbox[2] - text_bbox[0]
-        text_height = text_bbox[3] - text_bbox[1]
+        # Busiest clients, under the logo
+        top_clients = stats.get("top_clients")
+        if top_clients:
+            lines = ["Top clients:"] + [f"{name[:18]}: {count:,}" for name, count in top_clients]
+            draw.multiline_text((width - 230, 144), "\n".join(lines), font=font_small, spacing=4, fill=0)
 
-        image_width, image_height = img.size
-        x_position = (image_width - text_width) // 2
-        y_position = (image_height - text_height) // 2
+        # Queries over the last 24 hours along the bottom
+        history = stats.get("history")
+        if history and len(history) > 1:
+            box = (8, height - 110, width - 8, height - 4)
+            draw.rectangle(box, fill="white")
+            draw_line_chart(
+                draw, box,
+                [
+                    ("Queries", [(ts, total) for ts, total, _ in history], BLUE),
+                    ("Blocked", [(ts, blocked) for ts, _, blocked in history], RED),
+                ],
+                x_format=lambda ts: datetime.fromtimestamp(ts).strftime("%H:%M"),
+                font_size=14,
+                y_ticks=3,
+            )
+        return img
 
-        draw.multiline_text(
-            (x_position, y_position), stats_text, font=font, align="center", fill=0
-        )
 
-        inky.set_image(img)
-        inky.show()
+@register
+class PiholeHistoryScreen(Screen):
+    """Queries and blocked queries over the last 24 hours, from the sampler's ring buffer."""
 
+    name = "pihole_history"
+    ttl = SAMPLE_INTERVAL
+    fonts = [(FONT_PATH, 28), (FONT_PATH, 20), (FONT_PATH, 16)]
 
-def show_pihole_stats():
-    api_url = "http://192.168.1.110"
-    password = load_password()
+    def fetch(self):
+        """The last day's samples; reads the local buffer only. The sampler starts the first time this runs."""
+        password = load_password()
+        if not password:
+            return None
+        return get_sampler(API_URL, password).samples.since(time.time() - 24 * 3600)
+
+    def has_content(self, samples):
+        return bool(samples) and len(samples) > 1
+
+    def render(self, samples, resolution):
+        width, height = resolution
+        img = Image.new("RGB", resolution, "white")
+        draw = ImageDraw.Draw(img)
+        font_title = get_font(FONT_PATH, 28)
+        font_stats = get_font(FONT_PATH, 20)
 
-    if not password:
-        print("Pi-hole password missing. Exiting.")
-        return
+        draw.text((12, 8), "Pi-hole - Last 24 Hours", font=font_title, fill=BLACK)
+        _, queries, blocked, clients = samples[-1]
+        percent = blocked / queries * 100 if queries else 0
+        summary = f"{queries:,} queries   {blocked:,} blocked ({percent:.1f}%)   {clients} clients"
+        draw.text((12, 46), summary, font=font_stats, fill=BLACK)
+        draw.line([(12, 76), (width - 12, 76)], fill=BLACK, width=2)
 
-    stats = fetch_pihole_stats(api_url, password)
+        # Totals over a whole day barely move between samples, so graph each interval's share
+        counts = per_interval(samples)
+        draw_line_chart(
+            draw, (8, 84, width - 8, height - 6),
+            [
+                ("Queries", [(ts, q) for ts, q, _ in counts], BLUE),
+                ("Blocked", [(ts, b) for ts, _, b in counts], RED),
+            ],
+            x_format=lambda ts: datetime.fromtimestamp(ts).strftime("%H:%M"),
+        )
+        return img
 
-    if stats:
-        display_pihole_stats(stats)
-    else:
-        print("Failed to display Pi-hole stats.")
+
+def display_pihole_stats(stats):
+    presenter = Presenter()
+    presenter.show(PiholeScreen().render(stats, presenter.resolution))
+
+
+def show_pihole_stats():
+    Presenter().present(PiholeScreen())
 
 
 if __name__ == "__main__":
+    import headless
+
+    headless.main("pihole", "pihole_history")  # With --headless this saves a PNG and exits
     show_pihole_stats()
@@ -0,0 +1,69 @@
+import hashlib
+import logging
+import time
+import warnings
+
+from display_manager import get_display, quantise
+
+logger = logging.getLogger("display_logger")
+
+
+class Presenter:
+    """
+    Owns the Inky panel; every frame reaches the display through show().
+    A full refresh takes around 30 seconds and wears the panel, so frames that
+    come out identical to the one already showing once quantised to the
+    panel's palette are not pushed again.
+    """
+
+    def __init__(self, inky=None):
+        self.inky = inky or get_display()
+        self.last_frame = None  # Hash of what is on the panel now
+        self.shown = 0
+        self.skipped = 0
+        self.timings = {}  # Seconds the last show() spent in each stage
+
+    @property
+    def resolution(self):
+        return self.inky.resolution
+
+    def forget(self):
+        """Call after anything else draws on the panel, e.g. a clean cycle."""
+        self.last_frame = None
+
+    def show(self, frame, saturation=0.5, border="WHITE"):
+        """Push a frame to the panel; returns False if it was already showing."""
+        start = time.perf_counter()
+        frame = quantise(frame, saturation)
+        self.timings = {"quantise": time.perf_counter() - start}
+        digest = hashlib.blake2b(frame.tobytes(), digest_size=16)
+        digest.update(f"{frame.mode}{frame.size}{border}".encode())
+        digest = digest.hexdigest()
+        if digest == self.last_frame:
+            self.skipped += 1
+            logger.info(f"Frame unchanged, skipping refresh ({self.shown} shown, {self.skipped} skipped)")
+            return False
+
+        start = time.perf_counter()
+        if border:
+            self.inky.set_border(getattr(self.inky, border))
+        with warnings.catch_warnings():
+            warnings.filterwarnings("ignore", message="Busy Wait: Held high")
+            try:
+                self.inky.set_image(frame, saturation=saturation)
+            except TypeError:
+                self.inky.set_image(frame)
+        self.inky.show()
+        self.timings["panel"] = time.perf_counter() - start
+        self.last_frame = digest
+        self.shown += 1
+        logger.info(f"Frame pushed to panel ({self.shown} shown, {self.skipped} skipped)")
+        return True
+
+    def present(self, screen):
+        """Fetch, render and show a screen; returns False if it had nothing to show."""
+        frame = screen.draw(self.resolution)
+        if frame is None:
+            return False
+        self.show(frame, screen.saturation, screen.border)
+        return True
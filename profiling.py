@@ -0,0 +1,77 @@
+import math
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+
+from atomic import write_json_atomic
+
+STATS_FILE = os.path.join(os.path.expanduser("~"), ".pi-display", "timings.json")
+WINDOW = 100  # Timings kept per screen and stage
+STAGES = ("fetch", "render", "quantise", "panel")  # In the order a frame goes through them
+
+
+def percentile(ordered, p):
+    """The p-th percentile of an already sorted list, by nearest rank."""
+    rank = math.ceil(p / 100 * len(ordered))
+    return ordered[max(0, rank - 1)]
+
+
+class Profiler:
+    """
+    Rolling timings of each stage of each screen, the last WINDOW of each,
+    summarised as p50/p95/max. Safe to record from any thread.
+    """
+
+    def __init__(self, path=STATS_FILE, window=WINDOW):
+        self.path = path
+        self.timings = defaultdict(lambda: deque(maxlen=window))  # (screen, stage) -> seconds
+        self.lock = threading.Lock()
+
+    def record(self, screen, stage, seconds):
+        with self.lock:
+            self.timings[(screen, stage)].append(seconds)
+
+    @contextmanager
+    def timed(self, screen, stage):
+        """Record how long the with block takes as one timing of screen's stage."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(screen, stage, time.perf_counter() - start)
+
+    def summary(self):
+        """{screen: {stage: {"count", "last", "p50", "p95", "max"}}} in seconds."""
+        with self.lock:
+            timings = {key: list(values) for key, values in self.timings.items()}
+        stats = defaultdict(dict)
+        for (screen, stage), values in timings.items():
+            ordered = sorted(values)
+            stats[screen][stage] = {
+                "count": len(values),
+                "last": round(values[-1], 4),
+                "p50": round(percentile(ordered, 50), 4),
+                "p95": round(percentile(ordered, 95), 4),
+                "max": round(ordered[-1], 4),
+            }
+        return dict(stats)
+
+    def describe(self, screen):
+        """One line with the p50/p95/max of every stage of a screen, for the log."""
+        stages = self.summary().get(screen, {})
+        parts = [
+            f"{stage} {s['p50']:.2f}/{s['p95']:.2f}/{s['max']:.2f}s"
+            for stage, s in sorted(stages.items(), key=lambda item: stage_order(item[0]))
+        ]
+        return f"Timings for {screen} (p50/p95/max): {', '.join(parts)}"
+
+    def save(self):
+        """Write the summary to the stats file, where the diagnostics screen reads it."""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        write_json_atomic(self.path, {"updated": time.time(), "screens": self.summary()})
+
+
+def stage_order(stage):
+    return STAGES.index(stage) if stage in STAGES else len(STAGES)
@@ -0,0 +1,60 @@
+import random
+import threading
+
+
+class RetryScheduler:
+    """
+    Retries failed downloads on background timer threads so nothing waits on
+    them. The nth retry comes after about base * factor**n seconds, capped at
+    cap, with random jitter so several failures don't all retry together.
+    Only one retry chain runs per key at a time.
+    """
+
+    def __init__(self, base=30, factor=2, cap=1800, attempts=6):
+        self.base = base
+        self.factor = factor
+        self.cap = cap
+        self.attempts = attempts
+        self.pending = set()
+        self.lock = threading.Lock()
+
+    def delay(self, attempt):
+        """Seconds to wait before the given retry, between half and all of the backoff."""
+        backoff = min(self.cap, self.base * self.factor**attempt)
+        return random.uniform(backoff / 2, backoff)
+
+    def schedule(self, key, func, on_success=None):
+        """
+        Call func() in the background until it returns something truthy, then
+        on_success(). Returns False if key already has retries pending.
+        """
+        with self.lock:
+            if key in self.pending:
+                return False
+            self.pending.add(key)
+        self._start(key, func, on_success, 0)
+        return True
+
+    def _start(self, key, func, on_success, attempt):
+        delay = self.delay(attempt)
+        print(f"Retrying {key} in {delay:.0f}s (attempt {attempt + 1}/{self.attempts})")
+        timer = threading.Timer(delay, self._attempt, args=(key, func, on_success, attempt))
+        timer.daemon = True
+        timer.start()
+
+    def _attempt(self, key, func, on_success, attempt):
+        try:
+            succeeded = func()
+        except Exception as e:
+            print(f"Retry of {key} failed: {e}")
+            succeeded = False
+
+        if not succeeded and attempt + 1 < self.attempts:
+            self._start(key, func, on_success, attempt + 1)
+            return
+        with self.lock:
+            self.pending.discard(key)
+        if succeeded and on_success:
+            on_success()
+        elif not succeeded:
+            print(f"Giving up on {key} after {self.attempts} retries")
@@ -0,0 +1,74 @@
+import mmap
+import os
+import struct
+import threading
+
+# magic, record struct format, capacity, number of records ever written
+HEADER = struct.Struct("<4s16sIQ")
+MAGIC = b"RING"
+
+
+class RingBuffer:
+    """
+    A fixed number of fixed-size records in a memory-mapped file, so samples
+    survive a restart without ever being rewritten as a whole. Records are
+    tuples packed with the struct format fmt; once capacity is reached each
+    new record overwrites the oldest. The file is started afresh if fmt or
+    capacity change.
+    """
+
+    def __init__(self, path, fmt, capacity):
+        self.path = path
+        self.record = struct.Struct(fmt)
+        self.capacity = capacity
+        self.lock = threading.Lock()
+        size = HEADER.size + self.record.size * capacity
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            resized = os.fstat(fd).st_size != size
+            if resized:
+                os.ftruncate(fd, size)
+            self.mm = mmap.mmap(fd, size)
+        finally:
+            os.close(fd)
+
+        magic, stored_fmt, stored_capacity, _ = HEADER.unpack_from(self.mm, 0)
+        expected = (MAGIC, fmt.encode().ljust(16, b"\0"), capacity)
+        if resized or (magic, stored_fmt, stored_capacity) != expected:
+            self.mm[:] = bytes(size)
+            HEADER.pack_into(self.mm, 0, MAGIC, fmt.encode(), capacity, 0)
+
+    def _written(self):
+        return HEADER.unpack_from(self.mm, 0)[3]
+
+    def _offset(self, index):
+        return HEADER.size + (index % self.capacity) * self.record.size
+
+    def append(self, *values):
+        """Add a record, overwriting the oldest if the buffer is full."""
+        with self.lock:
+            written = self._written()
+            self.record.pack_into(self.mm, self._offset(written), *values)
+            # Count the record only once it is fully written
+            struct.pack_into("<Q", self.mm, HEADER.size - 8, written + 1)
+            self.mm.flush()
+
+    def records(self):
+        """Every stored record, oldest first."""
+        with self.lock:
+            written = self._written()
+            start = max(0, written - self.capacity)
+            return [self.record.unpack_from(self.mm, self._offset(i)) for i in range(start, written)]
+
+    def since(self, timestamp):
+        """Records whose first field, a timestamp, is at or after timestamp."""
+        return [record for record in self.records() if record[0] >= timestamp]
+
+    def __len__(self):
+        with self.lock:
+            return min(self._written(), self.capacity)
+
+    def close(self):
+        self.mm.close()
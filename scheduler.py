@@ -0,0 +1,301 @@
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from profiling import Profiler
+from snapshots import stale_overlay
+
+logger = logging.getLogger("display_logger")
+
+# How long to wait before going round again when no screen has anything to show
+IDLE_SECONDS = 60
+
+# How long a screen's first fetch gets before its snapshot from the last run is shown instead
+SNAPSHOT_GRACE = 5
+# Mark snapshots shown in place of fresh data with when that data was fetched
+STALE_OVERLAY = True
+
+
+async def run_blocking(func, *args, executor=None):
+    """Run a blocking call on a worker thread without holding up the loop."""
+    return await asyncio.get_running_loop().run_in_executor(executor, func, *args)
+
+
+class Scheduler:
+    """
+    Runs the rotation on asyncio.
+
+    Every screen has its own background task that re-fetches its data once it
+    is older than the screen's ttl, so bringing a screen up never waits on the
+    network. The rotation shows each screen that has something to show for
+    its dwell time and renders the next one while the current one is up.
+    Only the first screen's fetch starts straight away, the rest start once
+    it is on the panel (or when the rotation reaches them) so they don't
+    compete with it for the first frame.
+
+    With a SnapshotStore every rendered frame is also saved to disk. A screen
+    whose first fetch is slow after a restart, or whose latest fetch failed,
+    is shown from its snapshot with a "stale since" note instead.
+
+    When a screen reports new data with data_changed(), or a screen showing
+    its snapshot gets fresh data, it is fetched and rendered again and, if it
+    is on the panel, redrawn straight away rather than at its next turn.
+    Renders share one worker thread so only one frame is drawn at a time and
+    a prerender never doubles the CPU and memory a render needs on the Pi;
+    fetches run on the default executor.
+    """
+
+    def __init__(self, screens, presenter, buttons, clear=None, snapshots=None, profiler=None):
+        self.screens = screens
+        self.presenter = presenter
+        self.buttons = buttons
+        self.clear = clear
+        self.snapshots = snapshots
+        self.profiler = profiler or Profiler()
+        self.resolution = presenter.resolution
+        self.render_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="render")
+
+        self.data = {}  # screen name -> latest fetched data
+        self.versions = {}  # screen name -> number of fetches completed
+        self.frames = {}  # screen name -> (version, frame) of the last render
+        self.fetched = {}  # screen name -> Event set after the first fetch
+        self.fetched_at = {}  # screen name -> time of the last successful fetch
+        self.failed_since = {}  # screen name -> time fetches started failing
+        self.render_locks = {}
+        self.refresh_tasks = {}  # screen name -> keep_fresh task
+        self.refetch_tasks = set()  # Fetches started by data_changed()
+        self.prerender_task = None
+        self.first_shown = asyncio.Event()  # Set once the first frame is on the panel
+        self.current = None  # Screen on the panel now
+        self.from_snapshot = set()  # Names of screens last shown from their snapshot
+        self.redraw = asyncio.Event()  # Set when the current screen has a newer frame
+
+    # ----------------- Data -----------------
+    async def fetch(self, screen):
+        try:
+            with self.profiler.timed(screen.name, "fetch"):
+                data = await run_blocking(screen.fetch)
+        except Exception as e:
+            logger.error(f"Fetch failed for {screen.name}: {e}", exc_info=True)
+            self.failed_since.setdefault(screen.name, time.time())
+            if screen.name in self.data:
+                return  # Keep showing the previous data
+            data = None
+        else:
+            self.failed_since.pop(screen.name, None)
+            self.fetched_at[screen.name] = time.time()
+        self.data[screen.name] = data
+        self.versions[screen.name] = self.versions.get(screen.name, 0) + 1
+        self.fetched[screen.name].set()
+        if screen is self.current and screen.name in self.from_snapshot and screen.name not in self.failed_since:
+            self.redraw.set()
+
+    def data_changed(self, screen, redraw=True):
+        task = asyncio.create_task(self.refetch(screen, redraw))
+        self.refetch_tasks.add(task)
+        task.add_done_callback(self.refetch_tasks.discard)
+
+    async def refetch(self, screen, redraw=True):
+        """Fetch a screen whose data_changed() was called and, if redraw, redraw it if it's showing."""
+        await self.fetch(screen)
+        if redraw and screen is self.current:
+            self.redraw.set()
+
+    async def keep_fresh(self, screen):
+        """Background task: re-fetch a screen's data every ttl seconds."""
+        while True:
+            await self.fetch(screen)
+            await asyncio.sleep(screen.ttl)
+
+    def start_refreshing(self, screen):
+        """Start the screen's keep_fresh task if it isn't running yet."""
+        if screen.name not in self.refresh_tasks:
+            self.refresh_tasks[screen.name] = asyncio.create_task(self.keep_fresh(screen))
+
+    def has_content(self, screen):
+        """False only once a fetch has confirmed the screen has nothing to show."""
+        if not self.fetched[screen.name].is_set():
+            return True
+        return screen.has_content(self.data[screen.name])
+
+    # ----------------- Frames -----------------
+    async def frame_for(self, screen):
+        """Return the rendered frame for the screen's latest data, or None."""
+        self.start_refreshing(screen)
+        if self.snapshots:
+            frame = await self.snapshot_frame(screen)
+            if frame is not None:
+                self.from_snapshot.add(screen.name)
+                return frame
+        self.from_snapshot.discard(screen.name)
+        await self.fetched[screen.name].wait()
+        async with self.render_locks[screen.name]:
+            version = self.versions[screen.name]
+            cached = self.frames.get(screen.name)
+            if cached and cached[0] == version:
+                return cached[1]
+
+            data = self.data[screen.name]
+            frame = None
+            if screen.has_content(data):
+                with self.profiler.timed(screen.name, "render"):
+                    frame = await run_blocking(
+                        screen.render, data, self.resolution, executor=self.render_executor
+                    )
+            self.frames[screen.name] = (version, frame)
+            if frame is not None and self.snapshots:
+                await run_blocking(
+                    self.snapshots.save, screen.name, frame,
+                    self.fetched_at.get(screen.name, time.time()), screen.saturation,
+                    executor=self.render_executor,
+                )
+            return frame
+
+    async def snapshot_frame(self, screen):
+        """
+        The screen's snapshot marked as stale, if its first fetch hasn't come
+        back within SNAPSHOT_GRACE or its latest fetch failed; otherwise None.
+        """
+        fetched = self.fetched[screen.name]
+        if not fetched.is_set():
+            try:
+                await asyncio.wait_for(fetched.wait(), SNAPSHOT_GRACE)
+            except asyncio.TimeoutError:
+                pass
+        if fetched.is_set() and screen.name not in self.failed_since:
+            return None
+
+        snapshot = await run_blocking(self.snapshots.load, screen.name)
+        if snapshot is None:
+            return None
+        frame, timestamp = snapshot
+        logger.info(f"Showing the snapshot of {screen.name} from {time.ctime(timestamp)}")
+        return stale_overlay(frame, timestamp) if STALE_OVERLAY else frame
+
+    async def prerender(self, screen):
+        try:
+            await self.frame_for(screen)
+        except Exception as e:
+            logger.error(f"Prerender failed for {screen.name}: {e}", exc_info=True)
+
+    # ----------------- Rotation -----------------
+    def next_index(self, index):
+        """Index of the next screen after index that may have something to show."""
+        for step in range(1, len(self.screens) + 1):
+            candidate = (index + step) % len(self.screens)
+            if self.has_content(self.screens[candidate]):
+                return candidate
+        return (index + 1) % len(self.screens)
+
+    def index_of(self, name, default):
+        for i, screen in enumerate(self.screens):
+            if screen.name == name:
+                return i
+        return default
+
+    async def show(self, screen):
+        """Put a screen on the panel; returns False if it had nothing to show."""
+        try:
+            frame = await self.frame_for(screen)
+        except Exception as e:
+            logger.error(f"Render failed for {screen.name}: {e}", exc_info=True)
+            return False
+        if frame is None:
+            return False
+        print(f"Display screen {screen}")
+        self.current = screen
+        await run_blocking(self.presenter.show, frame, screen.saturation, screen.border)
+        self.first_shown.set()
+        self.report(screen)
+        if screen.on_shown():
+            self.data_changed(screen, redraw=False)
+        return True
+
+    def report(self, screen):
+        """Log the screen's stage timings and update the stats file, once per showing."""
+        for stage, seconds in self.presenter.timings.items():
+            self.profiler.record(screen.name, stage, seconds)
+        logger.info(self.profiler.describe(screen.name))
+        try:
+            self.profiler.save()
+        except OSError as e:
+            logger.error(f"Could not write timings: {e}")
+
+    async def wait(self, dwell):
+        """
+        Wait up to dwell seconds for a button action. Returns the action,
+        "redraw" if the current screen got newer data first, or None.
+        """
+        self.redraw.clear()
+        button = asyncio.create_task(self.buttons.wait(dwell))
+        redraw = asyncio.create_task(self.redraw.wait())
+        await asyncio.wait({button, redraw}, return_when=asyncio.FIRST_COMPLETED)
+        if button.done():
+            redraw.cancel()
+            return button.result()
+        button.cancel()
+        return "redraw"
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        for screen in self.screens:
+            self.fetched[screen.name] = asyncio.Event()
+            self.render_locks[screen.name] = asyncio.Lock()
+            # data_changed() may be called from any thread
+            screen.notify = partial(loop.call_soon_threadsafe, self.data_changed, screen)
+        try:
+            index = 0
+            skipped = 0
+            while True:
+                screen = self.screens[index]
+                try:
+                    shown = await self.show(screen)
+                except Exception as e:
+                    logger.error(f"Error displaying {screen.name}: {e}", exc_info=True)
+                    shown = False
+
+                next_index = self.next_index(index)
+                if not shown:
+                    skipped += 1
+                    if skipped < len(self.screens):
+                        index = next_index
+                        continue
+                    # Nothing anywhere to show, wait for new data or a button
+                    dwell = IDLE_SECONDS
+                else:
+                    dwell = screen.dwell
+                skipped = 0
+                for other in self.screens:
+                    self.start_refreshing(other)
+
+                # Render the next screen while this one is showing
+                self.prerender_task = asyncio.create_task(
+                    self.prerender(self.screens[next_index])
+                )
+
+                action = await self.wait(dwell)
+                if action == "redraw":
+                    print(f"Redrawing {screen} with fresh data")
+                elif action == "picture":
+                    print("Jumping to displaying a picture")
+                    index = self.index_of("image", next_index)
+                elif action == "refresh":
+                    print("Refreshing the current screen")
+                    await self.fetch(screen)
+                elif action == "clear":
+                    print("Forcing a screen clean")
+                    if self.clear:
+                        await run_blocking(self.clear)
+                        self.presenter.forget()
+                    index = next_index
+                else:
+                    if action == "next":
+                        print("Skipping to next function")
+                    index = next_index
+        finally:
+            for task in self.refresh_tasks.values():
+                task.cancel()
+            self.render_executor.shutdown(wait=False)
+
@@ -0,0 +1,103 @@
+import importlib
+
+# Registry of every screen that can appear in the rotation, by name
+SCREENS = {}
+
+# Module that defines each screen, imported the first time the screen is used
+# so startup only pays for the screens actually in the rotation
+SCREEN_MODULES = {
+    "apod": "apod",
+    "birthdays": "birthdays",
+    "calendar": "google-calendar",
+    "date": "date_display",
+    "diagnostics": "diagnostics",
+    "image": "image",
+    "pi_health": "pi_health",
+    "pihole": "pihole",
+    "pihole_history": "pihole",
+    "speedtest": "speedtest_display",
+    "stock": "stocks",
+    "watchlist": "stocks",
+    "weather": "weather",
+}
+
+
+def register(cls):
+    """Class decorator that makes a Screen available to create_screen() by its name."""
+    SCREENS[cls.name] = cls
+    return cls
+
+
+def create_screen(spec):
+    """
+    Build a screen from a rotation entry such as "weather" or "stock:IGG.L".
+    Anything after the colon is passed to the screen's constructor.
+    """
+    name, _, arg = spec.partition(":")
+    cls = screen_class(name)
+    return cls(arg) if arg else cls()
+
+
+def screen_class(name):
+    """The Screen class registered as name, importing its module if needed."""
+    if name not in SCREENS and name in SCREEN_MODULES:
+        importlib.import_module(SCREEN_MODULES[name])
+    return SCREENS[name]
+
+
+class Screen:
+    """
+    One display in the rotation, split into stages:
+
+    fetch()                  gathers the data (network, files, sensors) and
+                             returns None when there is nothing to show
+    render(data, resolution) draws that data onto a new PIL image
+
+    Neither stage touches the panel, that is left to the Presenter.
+    The scheduler re-fetches a screen's data every ttl seconds and keeps it
+    on the panel for dwell seconds. fonts lists the (path, size) pairs render()
+    uses so they can be loaded before the first render. Screens whose data
+    can arrive outside fetch(), such as a background retry, call
+    data_changed() so the scheduler fetches again and redraws them. Screens
+    that step through a series, such as photos, only move on in on_shown().
+    """
+
+    name = None
+    saturation = 0.5
+    border = "WHITE"
+    ttl = 1200
+    dwell = 1200
+    fonts = ()
+    notify = None  # Set by the Scheduler; called by data_changed()
+
+    def fetch(self):
+        return None
+
+    def data_changed(self):
+        """Call from any thread once fetch() would return newer data than last time."""
+        if self.notify:
+            self.notify()
+
+    def on_shown(self):
+        """
+        Called by the scheduler once the screen is on the panel. Return True
+        if fetch() now returns something new, so it is fetched again ready
+        for the next showing.
+        """
+        return False
+
+    def has_content(self, data):
+        return data is not None
+
+    def render(self, data, resolution):
+        raise NotImplementedError
+
+    def draw(self, resolution):
+        """Fetch and render in one go, returning None if there is nothing to show."""
+        data = self.fetch()
+        if not self.has_content(data):
+            return None
+        return self.render(data, resolution)
+
+    def __repr__(self):
+        return f"<Screen {self.name}>"
@@ -0,0 +1,73 @@
+import json
+import os
+import re
+import time
+from datetime import datetime
+
+from PIL import Image, ImageDraw
+
+from atomic import write_json_atomic
+from display_manager import quantise
+from fonts import get_font
+
+FONT_PATH = "./resources/fonts/Roboto-Medium.ttf"
+SNAPSHOT_DIR = os.path.join(os.path.expanduser("~"), ".pi-display", "snapshots")
+
+
+class SnapshotStore:
+    """
+    The last frame each screen rendered, kept on disk so it can go back on the
+    panel after a restart or a failed fetch without touching the network.
+
+    Each screen has a palette PNG of its frame, already quantised so it stays
+    small, and a JSON file holding the timestamp of the data it was drawn from.
+    The data itself isn't kept, the frame is all a restart needs.
+    """
+
+    def __init__(self, directory=SNAPSHOT_DIR):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, name, extension):
+        return os.path.join(self.directory, re.sub(r"[^\w.-]", "_", name) + extension)
+
+    def save(self, name, frame, timestamp, saturation=0.5):
+        """Store a screen's frame along with the time its data was fetched."""
+        image_path = self._path(name, ".png")
+        tmp_path = f"{image_path}.tmp"
+        quantise(frame, saturation).save(tmp_path, format="PNG")
+        os.replace(tmp_path, image_path)
+        # JSON last, so it never points at a frame that hasn't been written
+        write_json_atomic(self._path(name, ".json"), {"name": name, "timestamp": timestamp})
+
+    def load(self, name):
+        """Return (frame, timestamp) for a screen, or None if there is no snapshot."""
+        try:
+            with open(self._path(name, ".json")) as f:
+                meta = json.load(f)
+            with Image.open(self._path(name, ".png")) as image:
+                image.load()
+                frame = image.copy()
+        except (OSError, ValueError) as e:
+            print(f"No snapshot for {name}: {e}")
+            return None
+        return frame, meta["timestamp"]
+
+
+def stale_overlay(frame, timestamp, now=None):
+    """Mark a frame with when its data was last fetched, in a box in the bottom right corner."""
+    frame = frame.convert("RGB")
+    draw = ImageDraw.Draw(frame)
+    font = get_font(FONT_PATH, 16)
+    when = datetime.fromtimestamp(timestamp)
+    now = datetime.fromtimestamp(now or time.time())
+    label = when.strftime("%H:%M" if when.date() == now.date() else "%-d %b %H:%M")
+    text = f"Stale since {label}"
+
+    left, top, right, bottom = draw.textbbox((0, 0), text, font=font)
+    width, height = frame.size
+    x = width - (right - left) - 12
+    y = height - (bottom - top) - 12
+    draw.rectangle([x - 6, y - 4, width - 6, height - 6], fill="white", outline="black")
+    draw.text((x - left, y - top), text, font=font, fill="black")
+    return frame
@@ -1,11 +1,11 @@
-import io
 import json
 import os
-import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
 from datetime import datetime
-from PIL import Image, ImageDraw, ImageFont
-from inky.auto import auto
+from PIL import Image, ImageDraw
+from presenter import Presenter
+from screen import Screen, register
+from fonts import get_font
+from charts import BLUE, ORANGE, draw_line_chart
 
 FONT_PATH = "./resources/fonts/Roboto-Medium.ttf"
 HISTORY_FILE = "/home/danny/.speedtest_history.json"
@@ -23,20 +23,27 @@ def load_history():
         return []
 
 
-def display_speedtest():
-    history = load_history()
+@register
+class SpeedtestScreen(Screen):
+    """Latest speedtest result and the trend from speedtest_runner.py's history."""
 
-    try:
-        inky = auto()
-        width, height = inky.resolution
+    name = "speedtest"
+    ttl = 3600  # speedtest_runner.py only runs twice a day
+    fonts = [(FONT_PATH, size) for size in (32, 22, 42, 14)]
+
+    def fetch(self):
+        return load_history()
+
+    def render(self, history, resolution):
+        width, height = resolution
 
         image = Image.new("RGB", (width, height), "white")
         draw = ImageDraw.Draw(image)
 
-        font_header = ImageFont.truetype(FONT_PATH, 32)
-        font_sub = ImageFont.truetype(FONT_PATH, 22)
-        font_label = ImageFont.truetype(FONT_PATH, 22)
-        font_value = ImageFont.truetype(FONT_PATH, 42)
+        font_header = get_font(FONT_PATH, 32)
+        font_sub = get_font(FONT_PATH, 22)
+        font_label = get_font(FONT_PATH, 22)
+        font_value = get_font(FONT_PATH, 42)
 
         grey = (100, 100, 100)
         black = (0, 0, 0)
@@ -88,44 +95,31 @@ def display_speedtest():
 
         # ── Trend graph ──────────────────────────────────────────
         if len(history) >= 2:
-            graph_h = height - STATS_HEIGHT
-            dpi = 100
-            fig, ax = plt.subplots(figsize=(width / dpi, graph_h / dpi), dpi=dpi)
-            fig.patch.set_facecolor("white")
-            ax.set_facecolor("white")
-
-            timestamps = [datetime.fromisoformat(e["timestamp"]) for e in history]
-            downloads  = [e["download"] for e in history]
-            uploads    = [e["upload"]   for e in history]
-
-            ax.plot(timestamps, downloads, color="#1a6fc4", linewidth=1.5,
-                    label="Download", marker="o", markersize=3)
-            ax.plot(timestamps, uploads, color="#e07b00", linewidth=1.5,
-                    label="Upload", marker="o", markersize=3)
-
-            ax.xaxis.set_major_formatter(mdates.DateFormatter("%-d %b"))
-            ax.xaxis.set_major_locator(mdates.AutoDateLocator())
-            plt.xticks(rotation=30, ha="right", fontsize=8)
-            ax.set_ylabel("Mbps", fontsize=9)
-            ax.grid(True, alpha=0.3)
-            ax.legend(fontsize=9, loc="upper left")
-            fig.tight_layout(pad=0.4)
-
-            buf = io.BytesIO()
-            fig.savefig(buf, format="png", dpi=dpi)
-            plt.close(fig)
-            buf.seek(0)
-
-            with Image.open(buf) as graph_img:
-                graph_img = graph_img.convert("RGB").resize((width, graph_h))
-                image.paste(graph_img, (0, STATS_HEIGHT))
-
-        inky.set_image(image)
-        inky.show()
+            timestamps = [datetime.fromisoformat(e["timestamp"]).timestamp() for e in history]
+            downloads = list(zip(timestamps, (e["download"] for e in history)))
+            uploads = list(zip(timestamps, (e["upload"] for e in history)))
+
+            draw_line_chart(
+                draw, (10, STATS_HEIGHT + 8, width - 10, height - 4),
+                [("Download", downloads, BLUE), ("Upload", uploads, ORANGE)],
+                x_format=lambda ts: datetime.fromtimestamp(ts).strftime("%-d %b"),
+                y_label="Mbps",
+                markers=True,
+                font_size=14,
+            )
 
+        return image
+
+
+def display_speedtest():
+    try:
+        Presenter().present(SpeedtestScreen())
     except Exception as e:
         print(f"Speedtest display: render failed: {e}")
 
 
 if __name__ == "__main__":
+    import headless
+
+    headless.main("speedtest")  # With --headless this saves a PNG and exits
     display_speedtest()
@@ -1,157 +1,364 @@
 import os
+import re
 import sys
 import io
 import json
 import time
 import contextlib
 from datetime import datetime, timezone
-import yfinance as yf
-import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
-from PIL import Image
-from inky.auto import auto
+from PIL import Image, ImageDraw
+from charts import BLACK, BLUE, GREEN, RED, draw_line_chart, draw_sparkline
+from fonts import get_font
+from fetch_cache import market_day
+from atomic import write_json_atomic
+from retry import RetryScheduler
+from presenter import Presenter
+from screen import Screen, register
 
-CACHE_FILE = os.path.join(os.path.expanduser("~"), ".stock_cache.json")
+FONT_PATH = "./resources/fonts/Roboto-Medium.ttf"
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".pi-display", "stocks")
+LEGACY_CACHE_FILE = os.path.join(os.path.expanduser("~"), ".stock_cache.json")
+HISTORY_DAYS = 183  # About 6 months of daily bars are kept for the graph
+DAY_MS = 24 * 3600 * 1000
+
+# Failed downloads are retried in the background after about 30s, 1, 2, 4, 8 and 16 minutes
+RETRIES = RetryScheduler(base=30, factor=2, cap=30 * 60, attempts=6)
 
 # ----------------- Cache Utilities -----------------
-def load_cache():
-    """Load the JSON cache from disk."""
-    if os.path.exists(CACHE_FILE):
-        with open(CACHE_FILE, "r") as f:
-            return json.load(f)
-    return {}
+def cache_path(symbol):
+    return os.path.join(CACHE_DIR, re.sub(r"[^\w.-]", "_", symbol) + ".json")
+
 
+def load_entry(symbol):
+    """
+    Return a symbol's cached {"history", "timestamp"}, or None. Falls back to
+    the old single-file cache so existing history isn't downloaded again.
+    """
+    for path, legacy in ((cache_path(symbol), False), (LEGACY_CACHE_FILE, True)):
+        try:
+            with open(path) as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if legacy:
+            entry = entry.get(symbol)
+        if entry and entry.get("history"):
+            return entry
+    return None
 
-def save_cache(cache):
-    """Save the JSON cache to disk."""
-    with open(CACHE_FILE, "w") as f:
-        json.dump(cache, f)
+
+def save_entry(symbol, history):
+    """Write one symbol's history to its own file, atomically."""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    write_json_atomic(cache_path(symbol), {"history": history, "timestamp": time.time()})
 
 
 def is_new_market_day(last_fetch_ts):
-    """Return True if the last fetch was before today 09:00 UTC."""
-    now_utc = datetime.now(timezone.utc)
-    today_9am_utc = datetime(year=now_utc.year, month=now_utc.month,
-                             day=now_utc.day, hour=9, tzinfo=timezone.utc)
-    return last_fetch_ts < today_9am_utc.timestamp()
+    """Return True if 09:00 UTC has passed since the last fetch."""
+    return time.time() >= market_day(last_fetch_ts)
+
+
+def merge_history(history, new_pairs, days=HISTORY_DAYS):
+    """
+    Cached [timestamp_ms, close] pairs with newly downloaded ones on the end,
+    new bars replacing any cached from the same trading day on, trimmed to
+    the last days. Bars are matched by trading day rather than exact time,
+    as older caches stamped some at local midnight, and come back stamped
+    like to_pairs() does.
+    """
+    bars = {trading_day(ts): close for ts, close in history}
+    if new_pairs:
+        first = trading_day(new_pairs[0][0])
+        bars = {day: close for day, close in bars.items() if day < first}
+        bars.update((trading_day(ts), close) for ts, close in new_pairs)
+    cutoff = (time.time() - days * 24 * 3600) * 1000
+    return [[day * DAY_MS, close] for day, close in sorted(bars.items()) if day * DAY_MS >= cutoff]
+
+
+def trading_day(ts_ms):
+    """Days since the epoch of a bar's timestamp; local midnight anywhere within 12 hours of UTC rounds to its date."""
+    return round(ts_ms / DAY_MS)
+
+
+def to_pairs(closes):
+    """
+    [timestamp_ms, close] pairs from a pandas Series of closing prices, each
+    stamped at UTC midnight of its trading day. Ticker.history() gives
+    times in the exchange's timezone and yf.download() gives naive dates,
+    so this keeps the same bar at the same time whichever one fetched it.
+    """
+    return [
+        [int(datetime.combine(ts.date(), datetime.min.time(), timezone.utc).timestamp() * 1000), float(close)]
+        for ts, close in closes.dropna().items()
+    ]
+
+
+def since_date(history):
+    """yfinance start date that re-downloads the last cached bar and everything after it."""
+    return datetime.fromtimestamp(history[-1][0] / 1000, tz=timezone.utc).strftime("%Y-%m-%d")
 
 
 # ----------------- Stock Fetching -----------------
-def fetch_stock(symbol):
+def download_history(symbol, history):
+    """
+    New [timestamp_ms, close] bars for symbol: everything since the last
+    cached bar, or 6 months of them if nothing is cached. The last cached
+    bar is always downloaded again, so an empty result means Yahoo failed.
+    Returns None if the download fails.
+    """
+    import yfinance as yf  # Pulls in pandas, so only load it when a download is due
+
+    try:
+        stderr_capture = io.StringIO()
+        with contextlib.redirect_stderr(stderr_capture):
+            stock = yf.Ticker(symbol)
+            if history:
+                hist = stock.history(start=since_date(history))
+            else:
+                hist = stock.history(period="6mo")
+        if not hist.empty:
+            return to_pairs(hist["Close"])
+        reason = stderr_capture.getvalue().strip()
+        print(f"No data returned for {symbol}: {reason or 'unknown reason'}")
+    except Exception as e:
+        print(f"Download failed for {symbol}: {e}")
+    return None
+
+
+def refresh_stock(symbol):
+    """Download and cache a symbol's new bars; returns the updated history, or None on failure."""
+    entry = load_entry(symbol)
+    history = entry["history"] if entry else []
+    new_pairs = download_history(symbol, history)
+    if not new_pairs:
+        return None
+    history = merge_history(history, new_pairs)
+    save_entry(symbol, history)
+    return history
+
+
+def download_histories(symbols, histories):
+    """
+    New bars for several symbols in one batched yfinance request, as
+    {symbol: [[timestamp_ms, close], ...]}. The request starts from the
+    earliest last cached bar, or covers 6 months if any symbol has no cache.
+    Symbols Yahoo sent nothing back for are left out.
+    """
+    import yfinance as yf
+
+    if all(histories.get(symbol) for symbol in symbols):
+        span = {"start": min(since_date(histories[symbol]) for symbol in symbols)}
+    else:
+        span = {"period": "6mo"}
+
+    stderr_capture = io.StringIO()
+    with contextlib.redirect_stderr(stderr_capture):
+        data = yf.download(
+            symbols, interval="1d", auto_adjust=True, group_by="column",
+            progress=False, threads=False, **span,
+        )
+    if data.empty:
+        reason = stderr_capture.getvalue().strip()
+        print(f"No data returned for {', '.join(symbols)}: {reason or 'unknown reason'}")
+        return {}
+
+    closes = data["Close"]
+    downloaded = {}
+    for symbol in symbols:
+        column = closes[symbol] if hasattr(closes, "columns") else closes
+        pairs = to_pairs(column)
+        if pairs:
+            downloaded[symbol] = pairs
+    return downloaded
+
+
+def fetch_watchlist(symbols, on_update=None):
+    """
+    {symbol: history_pairs} for every symbol with at least two cached or
+    downloaded bars. Only symbols due a refresh are downloaded, all in one
+    request; any that fail are retried in the background like fetch_stock().
+    """
+    histories = {}
+    due = []
+    for symbol in symbols:
+        entry = load_entry(symbol)
+        histories[symbol] = entry["history"] if entry else []
+        if not entry or is_new_market_day(entry["timestamp"]):
+            due.append(symbol)
+
+    if due:
+        downloaded = refresh_watchlist(due, histories)
+        missing = [symbol for symbol in due if symbol not in downloaded]
+        if missing:
+            print(f"Using cached prices for {', '.join(missing)}")
+            RETRIES.schedule(
+                f"watchlist:{','.join(missing)}",
+                lambda: refresh_watchlist(missing, dict(histories)),
+                on_update,
+            )
+
+    return {symbol: history for symbol, history in histories.items() if len(history) >= 2}
+
+
+def refresh_watchlist(symbols, histories):
+    """
+    Download and cache new bars for symbols in one request, updating
+    histories in place. Returns {symbol: history} for those that downloaded.
+    """
+    try:
+        downloaded = download_histories(symbols, histories)
+    except Exception as e:
+        print(f"Watchlist download failed: {e}")
+        return {}
+    for symbol, new_pairs in downloaded.items():
+        histories[symbol] = merge_history(histories[symbol], new_pairs)
+        save_entry(symbol, histories[symbol])
+    return {symbol: histories[symbol] for symbol in downloaded}
+
+
+def fetch_stock(symbol, on_update=None):
     """
     Fetch stock data from Yahoo or from cache if available.
     Returns (latest_close, price_change, history_pairs) where history_pairs
     is a list of [timestamp_ms, close_price] for graph plotting.
-    """
-    cache = load_cache()
-    cached_entry = cache.get(symbol)
-    use_cache = False
 
-    if cached_entry:
-        last_fetch_ts = cached_entry["timestamp"]
-        if not is_new_market_day(last_fetch_ts):
-            use_cache = True
+    If the download fails the cached prices are returned straight away and
+    the download is retried in the background with backoff, calling
+    on_update() once new prices are cached.
+    """
+    cached_entry = load_entry(symbol)
+    history_pairs = cached_entry["history"] if cached_entry else []
 
-    if use_cache:
-        latest_close = cached_entry["latest_close"]
-        previous_close = cached_entry["previous_close"]
-        history_pairs = cached_entry.get("history", [])
-        print(f"Using cached price for {symbol}: {latest_close:.2f}")
+    if cached_entry and not is_new_market_day(cached_entry["timestamp"]):
+        print(f"Using cached price for {symbol}: {history_pairs[-1][1]:.2f}")
     else:
-        stock = yf.Ticker(symbol)
-        hist = None
-        for attempt in range(3):
-            try:
-                stderr_capture = io.StringIO()
-                with contextlib.redirect_stderr(stderr_capture):
-                    hist = stock.history(period="6mo")
-                reason = stderr_capture.getvalue().strip()
-                if not hist.empty:
-                    break
-                else:
-                    print(f"No data returned for {symbol} (attempt {attempt+1}/3): {reason or 'unknown reason'}")
-            except Exception as e:
-                print(f"Attempt {attempt+1} failed for {symbol}: {e}")
-            if attempt < 2:
-                print(f"Retrying in 5s...")
-                time.sleep(5)
-
-        if hist is not None and not hist.empty:
-            latest_close = hist["Close"].iloc[-1]
-            previous_close = hist["Close"].iloc[-2]
-            history_pairs = [
-                [int(ts.timestamp() * 1000), float(close)]
-                for ts, close in zip(hist.index, hist["Close"])
-            ]
-            cache[symbol] = {
-                "latest_close": float(latest_close),
-                "previous_close": float(previous_close),
-                "history": history_pairs,
-                "timestamp": time.time()
-            }
-            save_cache(cache)
-        elif cached_entry:
-            latest_close = cached_entry["latest_close"]
-            previous_close = cached_entry["previous_close"]
-            history_pairs = cached_entry.get("history", [])
-            print(f"Using stale cached price for {symbol}: {latest_close:.2f}")
+        fresh = refresh_stock(symbol)
+        if fresh:
+            history_pairs = fresh
         else:
-            print(f"No data available for {symbol}")
-            return None, None, None
+            if history_pairs:
+                print(f"Using stale cached price for {symbol}: {history_pairs[-1][1]:.2f}")
+            RETRIES.schedule(symbol, lambda: refresh_stock(symbol), on_update)
 
+    if len(history_pairs) < 2:
+        print(f"No data available for {symbol}")
+        return None, None, None
+
+    latest_close = history_pairs[-1][1]
+    previous_close = history_pairs[-2][1]
     price_change = latest_close - previous_close
     return latest_close, price_change, history_pairs
 
 
-# ----------------- Display Utilities -----------------
-def display_stock_graph(buf):
-    inky = auto()
-    saturation = 0.5
-    with Image.open(buf) as img:
-        resizedimage = img.resize(inky.resolution)
-        try:
-            inky.set_image(resizedimage, saturation=saturation)
-        except TypeError:
-            inky.set_image(resizedimage)
-        inky.show()
+# ----------------- Screen -----------------
+@register
+class StockScreen(Screen):
+    """Six month closing price graph for one stock symbol."""
+
+    name = "stock"
+    ttl = 3600  # Prices are cached on disk and only change daily
+    fonts = [(FONT_PATH, 24), (FONT_PATH, 16)]
+
+    def __init__(self, symbol):
+        self.symbol = symbol
+        self.name = f"stock:{symbol}"
+
+    def fetch(self):
+        """Fetch stock and print latest price; None if there is nothing to plot."""
+        latest_close, price_change, history_pairs = fetch_stock(self.symbol, self.data_changed)
+        if latest_close is None:
+            print(f"No price data for {self.symbol}")
+            return None
+
+        direction = "▲" if price_change > 0 else "▼"
+        print(f"The latest closing price for {self.symbol} is {latest_close:.2f} ({direction}{abs(price_change):.2f})")
+
+        if not history_pairs:
+            print(f"No historical data for {self.symbol}")
+            return None
+        return latest_close, price_change, history_pairs
+
+    def render(self, stock, resolution):
+        """Plot the graph at the panel resolution."""
+        latest_close, price_change, history_pairs = stock
+        direction = "+" if price_change > 0 else "-"  # Roboto has no arrow glyphs
+
+        image = Image.new("RGB", resolution, "white")
+        draw = ImageDraw.Draw(image)
+        title = f"{self.symbol} - 6 Month Performance ({direction}{abs(price_change):.2f})"
+        draw.text((12, 8), title, font=get_font(FONT_PATH, 24), fill="black")
+
+        points = [(ts_ms / 1000, close) for ts_ms, close in history_pairs]
+        draw_line_chart(
+            draw, (4, 44, resolution[0] - 4, resolution[1] - 4),
+            [("Closing Price", points, BLUE)],
+            x_format=lambda ts: datetime.fromtimestamp(ts, tz=timezone.utc).strftime("%d-%b"),
+            y_label="Price",
+        )
+        return image
+
+
+@register
+class WatchlistScreen(Screen):
+    """Latest price, daily change and a 6 month sparkline for several symbols."""
+
+    name = "watchlist"
+    ttl = 3600  # Prices are cached on disk and only change daily
+    fonts = [(FONT_PATH, 28), (FONT_PATH, 22), (FONT_PATH, 18)]
+
+    def __init__(self, symbols):
+        self.symbols = [symbol.strip() for symbol in symbols.split(",") if symbol.strip()]
+        self.name = f"watchlist:{symbols}"
+
+    def fetch(self):
+        histories = fetch_watchlist(self.symbols, self.data_changed)
+        return [(symbol, histories[symbol]) for symbol in self.symbols if symbol in histories] or None
+
+    def render(self, watchlist, resolution):
+        """A grid with one cell per symbol: name, price, change and sparkline."""
+        width, height = resolution
+        image = Image.new("RGB", resolution, "white")
+        draw = ImageDraw.Draw(image)
+        font_title = get_font(FONT_PATH, 28)
+        font_symbol = get_font(FONT_PATH, 22)
+        font_change = get_font(FONT_PATH, 18)
+
+        draw.text((12, 8), "Watchlist - 6 Months", font=font_title, fill=BLACK)
+        draw.line([(12, 46), (width - 12, 46)], fill=BLACK, width=2)
+
+        columns = 1 if len(watchlist) == 1 else 2 if len(watchlist) <= 6 else 3
+        rows = -(-len(watchlist) // columns)
+        cell_w = (width - 12) // columns
+        cell_h = (height - 52) // rows
+
+        for i, (symbol, history) in enumerate(watchlist):
+            left = 6 + (i % columns) * cell_w
+            top = 52 + (i // columns) * cell_h
+            right, bottom = left + cell_w - 6, top + cell_h - 6
+            latest, previous = history[-1][1], history[-2][1]
+            change = (latest - previous) / previous * 100 if previous else 0
+            colour = GREEN if change >= 0 else RED
+
+            draw.rectangle([left, top, right, bottom], outline=BLACK)
+            draw.text((left + 8, top + 4), symbol, font=font_symbol, fill=BLACK)
+            price = f"{latest:,.2f}"
+            b = draw.textbbox((0, 0), price, font=font_symbol)
+            draw.text((right - 8 - (b[2] - b[0]), top + 4), price, font=font_symbol, fill=BLACK)
+            change_text = f"{'+' if change >= 0 else '-'}{abs(change):.2f}%"
+            b = draw.textbbox((0, 0), change_text, font=font_change)
+            draw.text((right - 8 - (b[2] - b[0]), top + 30), change_text, font=font_change, fill=colour)
+
+            draw_sparkline(
+                draw, (left + 10, top + 56, right - 10, bottom - 8),
+                [close for _, close in history], colour=BLUE,
+            )
+        return image
 
 
 # ----------------- Main Function -----------------
 def fetch_and_display_stock(symbol):
     """Fetch stock, print latest price, plot graph, and display on Inky."""
-    latest_close, price_change, history_pairs = fetch_stock(symbol)
-    if latest_close is None:
-        print(f"No price data for {symbol}")
-        return
-
-    direction = "▲" if price_change > 0 else "▼"
-    print(f"The latest closing price for {symbol} is {latest_close:.2f} ({direction}{abs(price_change):.2f})")
-
-    if not history_pairs:
-        print(f"No historical data for {symbol}")
-        return
-
-    # Reconstruct dates and closes from cached history pairs
-    dates = [datetime.fromtimestamp(ts_ms / 1000, tz=timezone.utc) for ts_ms, _ in history_pairs]
-    closes = [close for _, close in history_pairs]
-
-    # Plot graph
-    plt.figure(figsize=(4, 3))
-    plt.plot(dates, closes, label="Closing Price", color="blue")
-    ax = plt.gca()
-    ax.xaxis.set_major_formatter(mdates.DateFormatter("%d-%b"))
-    plt.xticks(rotation=45)
-    plt.xlabel("Date")
-    plt.ylabel("Price")
-    plt.title(f"{symbol} - 6 Month Performance ({direction}{abs(price_change):.2f})")
-    plt.grid(True)
-    plt.legend()
-
-    buf = io.BytesIO()
-    plt.savefig(buf, format="png", bbox_inches="tight")
-    plt.close()
-    buf.seek(0)
-    display_stock_graph(buf)
+    Presenter().present(StockScreen(symbol))
 
 
 # ----------------- CLI Entry Point -----------------
@@ -161,5 +368,8 @@ if __name__ == "__main__":
         print("Error: Stock symbol not provided")
         sys.exit(1)
     symbol = sys.argv[1]
+    import headless
+
+    headless.main(f"stock:{symbol}")  # With --headless this saves a PNG and exits
     print(f"Running stock script for {symbol}")
     fetch_and_display_stock(symbol)
@@ -0,0 +1,75 @@
+# Each palette's colours in driver index order, as (name, saturated RGB, desaturated RGB).
+# The Impression values are the ones the 4"/5.7" drivers blend between in set_image()
+PALETTES = {
+    "impression": (
+        ("BLACK", (57, 48, 57), (0, 0, 0)),
+        ("WHITE", (255, 255, 255), (255, 255, 255)),
+        ("GREEN", (58, 91, 70), (0, 255, 0)),
+        ("BLUE", (61, 59, 94), (0, 0, 255)),
+        ("RED", (156, 72, 75), (255, 0, 0)),
+        ("YELLOW", (208, 190, 71), (255, 255, 0)),
+        ("ORANGE", (177, 106, 73), (255, 140, 0)),
+    ),
+    "red": (
+        ("BLACK", (0, 0, 0), (0, 0, 0)),
+        ("WHITE", (255, 255, 255), (255, 255, 255)),
+        ("RED", (255, 0, 0), (255, 0, 0)),
+    ),
+    "yellow": (
+        ("BLACK", (0, 0, 0), (0, 0, 0)),
+        ("WHITE", (255, 255, 255), (255, 255, 255)),
+        ("YELLOW", (255, 255, 0), (255, 255, 0)),
+    ),
+    "black": (
+        ("BLACK", (0, 0, 0), (0, 0, 0)),
+        ("WHITE", (255, 255, 255), (255, 255, 255)),
+    ),
+}
+PANEL_COLOUR = {"impression": "multi", "red": "red", "yellow": "yellow", "black": "black"}
+
+
+class VirtualInky:
+    """
+    Stand-in for an Inky driver with no hardware behind it, for benchmarks
+    and previews. It has the same colour index attributes, resolution and
+    palette blending as a real panel, and keeps every frame passed to
+    show() in frames instead of drawing it.
+    """
+
+    def __init__(self, resolution=(640, 400), palette="impression"):
+        self.resolution = tuple(resolution)
+        self.width, self.height = self.resolution
+        self.WIDTH, self.HEIGHT = self.resolution  # The drivers' names, which clear.py uses
+        self.palette = PALETTES[palette]
+        self.colour = PANEL_COLOUR[palette]
+        for index, (name, _, _) in enumerate(self.palette):
+            setattr(self, name, index)
+        self.border = None
+        self.image = None
+        self.frames = []  # Every frame shown, oldest first
+
+    def _palette_blend(self, saturation, dtype="uint8"):
+        """RGB palette as a flat list, each colour mixed between its saturated and plain version."""
+        palette = []
+        for _, saturated, desaturated in self.palette:
+            palette += [int(s * saturation + d * (1 - saturation)) for s, d in zip(saturated, desaturated)]
+        return palette
+
+    def set_border(self, colour):
+        self.border = colour
+
+    def set_image(self, image, saturation=0.5):
+        if image.size != self.resolution:
+            raise ValueError(f"Image is {image.size}, the display is {self.resolution}")
+        self.image = image
+
+    def show(self):
+        if self.image is None:
+            raise ValueError("show() called before set_image()")
+        self.frames.append(self.image)
+
+
+def parse_resolution(text):
+    """Parse WIDTHxHEIGHT, e.g. 640x400, for command line options."""
+    width, _, height = text.lower().partition("x")
+    return int(width), int(height)
@@ -1,12 +1,19 @@
 import math
-import requests
-from PIL import Image, ImageDraw, ImageFont
-from inky.auto import auto
+from PIL import Image, ImageDraw
+from presenter import Presenter
+from screen import Screen, register
+from fonts import get_font
+from fetch_cache import cached_fetch, max_age
 from datetime import datetime
 
 FONT_PATH = "./resources/fonts/Roboto-Medium.ttf"
 CREDS_PATH = "./creds/weather-location.txt"
 
+# Forecasts are re-downloaded after 25 minutes, in time for the screen's next
+# refresh, and an older one is shown for up to an hour more while a new one downloads
+WEATHER_EXPIRY = max_age(25 * 60)
+WEATHER_STALE = 3600
+
 WMO_CODES = {
     0: "Clear Sky",
     1: "Mainly Clear",
@@ -177,6 +184,15 @@ def draw_icon(draw, cx, cy, size, code):
 # --- Data fetch ---
 
 def fetch_weather(lat, lon):
+    """Open-Meteo forecast for a location, cached so a restart or revisit doesn't re-download it."""
+    return cached_fetch(
+        f"weather:{lat},{lon}", lambda: download_weather(lat, lon), WEATHER_EXPIRY, stale_for=WEATHER_STALE
+    )
+
+
+def download_weather(lat, lon):
+    import requests  # Deferred so startup doesn't pay for it
+
     url = (
         "https://api.open-meteo.com/v1/forecast"
         f"?latitude={lat}&longitude={lon}"
@@ -191,35 +207,42 @@ def fetch_weather(lat, lon):
 
 # --- Display ---
 
-def display_weather():
-    try:
-        with open(CREDS_PATH) as f:
-            lat, lon = f.read().strip().split(",")
-    except Exception as e:
-        print(f"Weather: failed to read location: {e}")
-        return
+@register
+class WeatherScreen(Screen):
+    """Current conditions and a three day forecast from Open-Meteo."""
 
-    try:
-        data = fetch_weather(lat.strip(), lon.strip())
-    except Exception as e:
-        print(f"Weather: fetch failed: {e}")
-        return
+    name = "weather"
+    ttl = 1800
+    fonts = [(FONT_PATH, size) for size in (32, 36, 22, 30, 23, 24, 20)]
 
-    try:
-        inky = auto()
-        width, height = inky.resolution
+    def fetch(self):
+        try:
+            with open(CREDS_PATH) as f:
+                lat, lon = f.read().strip().split(",")
+        except Exception as e:
+            print(f"Weather: failed to read location: {e}")
+            return None
+
+        try:
+            return fetch_weather(lat.strip(), lon.strip())
+        except Exception as e:
+            print(f"Weather: fetch failed: {e}")
+            return None
+
+    def render(self, data, resolution):
+        width, height = resolution
 
         image = Image.new("RGB", (width, height), "white")
         draw = ImageDraw.Draw(image)
 
-        font_header = ImageFont.truetype(FONT_PATH, 32)
-        font_temp_hdr = ImageFont.truetype(FONT_PATH, 36)
-        font_info_label = ImageFont.truetype(FONT_PATH, 22)
-        font_info_val = ImageFont.truetype(FONT_PATH, 30)
-        font_condition = ImageFont.truetype(FONT_PATH, 32)
-        font_day = ImageFont.truetype(FONT_PATH, 23)
-        font_hilo = ImageFont.truetype(FONT_PATH, 24)
-        font_rain = ImageFont.truetype(FONT_PATH, 20)
+        font_header = get_font(FONT_PATH, 32)
+        font_temp_hdr = get_font(FONT_PATH, 36)
+        font_info_label = get_font(FONT_PATH, 22)
+        font_info_val = get_font(FONT_PATH, 30)
+        font_condition = get_font(FONT_PATH, 32)
+        font_day = get_font(FONT_PATH, 23)
+        font_hilo = get_font(FONT_PATH, 24)
+        font_rain = get_font(FONT_PATH, 20)
 
         current = data["current"]
         daily = data["daily"]
@@ -313,12 +336,18 @@ def display_weather():
                 draw.line([(col_x + col_w, 324), (col_x + col_w, height - 8)],
                           fill=C_BLACK, width=1)
 
-        inky.set_image(image)
-        inky.show()
+        return image
 
+
+def display_weather():
+    try:
+        Presenter().present(WeatherScreen())
     except Exception as e:
         print(f"Weather: render failed: {e}")
 
 
 if __name__ == "__main__":
+    import headless
+
+    headless.main("weather")  # With --headless this saves a PNG and exits
     display_weather()